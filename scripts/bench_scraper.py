@@ -0,0 +1,240 @@
+"""
+Offline replay harness + benchmark for scrap_connectors.py
+
+Serves fixtures recorded with `scrap_connectors.py --record DIR` through
+page.route, so listing harvest, detail scraping and extraction can be
+measured without a live, logged-in claude.ai session.
+
+Usage:
+  1. Record once:  python3 scrap_connectors.py --fresh --record fixtures
+  2. Benchmark:    python3 bench_scraper.py fixtures
+  3. Scaled:       python3 bench_scraper.py fixtures --scale 10 --concurrency 4
+     (Synthesizes 10x the recorded corpus by re-serving detail pages under
+      generated uuids)
+
+Output: DIR/bench-<timestamp>.json (or --out PATH)
+"""
+
+import asyncio
+import argparse
+import html
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+
+import scrap_connectors as scraper
+
+DETAIL_PATH = re.compile(r"^/directory/([0-9a-f-]{20,})/?$")
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def load_fixtures(path) -> dict:
+    """Load a recorded fixtures directory."""
+    with open(os.path.join(path, "cards.json"), "r") as f:
+        cards = json.load(f)
+    with open(os.path.join(path, "listing.html"), "r", encoding="utf-8") as f:
+        listing = f.read()
+
+    details = {}
+    detail_dir = os.path.join(path, "detail")
+    for name in os.listdir(detail_dir):
+        if name.endswith(".html"):
+            with open(os.path.join(detail_dir, name), "r", encoding="utf-8") as f:
+                details[name[:-len(".html")]] = f.read()
+
+    responses = {}
+    responses_path = os.path.join(path, "responses.jsonl")
+    if os.path.exists(responses_path):
+        with open(responses_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    r = json.loads(line)
+                except ValueError:
+                    continue
+                responses[r["url"]] = r
+
+    # Only cards with a recorded detail page can be replayed
+    cards = [c for c in cards if scraper.card_uuid(c) in details]
+    return {"cards": cards, "listing": listing, "details": details, "responses": responses}
+
+
+def synthetic_uuid(i) -> str:
+    """Deterministic uuid for the i-th synthetic connector."""
+    return f"00000000-0000-4000-8000-{i:012x}"
+
+
+def scale_fixtures(fixtures, scale) -> dict:
+    """
+    Build a corpus `scale` times the recorded one. Each synthetic card
+    reuses a recorded detail page; the listing is regenerated as plain
+    card links in the shape collect_cards_from_listing expects.
+    """
+    if scale <= 1:
+        return fixtures
+    base = fixtures["cards"]
+    cards, details, links = [], {}, []
+    for i in range(len(base) * scale):
+        src = base[i % len(base)]
+        uuid = synthetic_uuid(i)
+        name = f"{src['name']} {i // len(base)}" if i >= len(base) else src["name"]
+        card = {
+            "name": name,
+            "tagline": src.get("tagline", ""),
+            "logo_url": src.get("logo_url", ""),
+            "detail_url": f"https://claude.ai/directory/{uuid}",
+        }
+        cards.append(card)
+        details[uuid] = fixtures["details"][scraper.card_uuid(src)]
+        links.append(
+            f'<a href="/directory/{uuid}"><img src="{html.escape(card["logo_url"])}">'
+            f'<div>{html.escape(name)}</div><div>{html.escape(card["tagline"])}</div></a>'
+        )
+    listing = (
+        "<!DOCTYPE html><html><body><div role='tablist'><button role='tab'>Web</button></div>"
+        + "\n".join(links)
+        + "</body></html>"
+    )
+    return {"cards": cards, "listing": listing, "details": details,
+            "responses": fixtures["responses"]}
+
+
+async def serve_fixtures(context, fixtures):
+    """Answer every request in the context from the fixtures; abort the rest."""
+
+    async def on_route(route):
+        url = route.request.url
+        parsed = urlparse(url)
+        if url in fixtures["responses"]:
+            r = fixtures["responses"][url]
+            await route.fulfill(status=r["status"], content_type=r["content_type"], body=r["body"])
+            return
+        if parsed.hostname == "claude.ai":
+            if parsed.path.rstrip("/") == "/directory":
+                await route.fulfill(status=200, content_type="text/html", body=fixtures["listing"])
+                return
+            m = DETAIL_PATH.match(parsed.path)
+            if m and m.group(1) in fixtures["details"]:
+                await route.fulfill(status=200, content_type="text/html",
+                                    body=fixtures["details"][m.group(1)])
+                return
+        await route.abort()
+
+    await context.route("**/*", on_route)
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+async def run_benchmark(fixtures, concurrency=1, extract_pages=10, repeats=5) -> dict:
+    """Replay Phase 1 and Phase 2 against the fixtures and time them."""
+    cards = fixtures["cards"]
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context(viewport={"width": 1280, "height": 900})
+        await serve_fixtures(context, fixtures)
+        page = await context.new_page()
+
+        # Phase 1: listing harvest
+        started = time.monotonic()
+        await page.goto("https://claude.ai/directory")
+        harvested = await scraper.harvest_cards(page)
+        listing_s = time.monotonic() - started
+
+        # Phase 2: detail pages through the real worker pool
+        started = time.monotonic()
+        connectors, errors = [], []
+        await scraper.scrape_cards(context, page, cards, set(), connectors, errors,
+                                   concurrency=concurrency, max_attempts=1, rate=None)
+        phase2_s = time.monotonic() - started
+
+        extraction = await scraper.benchmark_extraction(page, cards[:extract_pages], repeats)
+        await browser.close()
+
+    return {
+        "cards": len(cards),
+        "concurrency": concurrency,
+        "listing": {
+            "harvested": len(harvested),
+            "seconds": round(listing_s, 2),
+            "cards_per_s": round(len(harvested) / listing_s, 1) if listing_s else None,
+        },
+        "detail": {
+            "scraped": len(connectors),
+            "errors": len(errors),
+            "seconds": round(phase2_s, 2),
+            "connectors_per_s": round(len(connectors) / phase2_s, 2) if phase2_s else None,
+        },
+        "extraction": extraction,
+        "stages": scraper.stage_stats(scraper.run_spans),
+        "waits": scraper.wait_summary(),
+    }
+
+
+def print_report(report):
+    """Print the headline numbers of a benchmark report."""
+    print(f"\n--- Replay benchmark: {report['cards']} cards, concurrency {report['concurrency']} ---")
+    lst, det = report["listing"], report["detail"]
+    print(f"  Listing:  {lst['harvested']} cards in {lst['seconds']}s ({lst['cards_per_s']} cards/s)")
+    print(f"  Details:  {det['scraped']} connectors in {det['seconds']}s "
+          f"({det['connectors_per_s']} connectors/s, {det['errors']} errors)")
+    for name in ("snapshot", "dom"):
+        r = report["extraction"].get(name)
+        if r:
+            print(f"  Extract {name:<8} p50 {r['p50_ms']:>7.1f} ms  p95 {r['p95_ms']:>7.1f} ms")
+    for stage, st in report["stages"].items():
+        print(f"  {stage:<16} p50 {st['p50_ms']:>7.0f} ms  p95 {st['p95_ms']:>7.0f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Offline replay benchmark for scrap_connectors.py")
+    parser.add_argument("fixtures", help="Directory recorded with scrap_connectors.py --record")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="Multiply the recorded corpus N times (default: 1)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Detail pages in parallel (default: 1)")
+    parser.add_argument("--extract-pages", type=int, default=10,
+                        help="Pages used for the extractor latency comparison (default: 10)")
+    parser.add_argument("--out", help="Where to write the JSON report")
+    args = parser.parse_args()
+
+    fixtures_dir = os.path.abspath(args.fixtures)
+    fixtures = scale_fixtures(load_fixtures(fixtures_dir), args.scale)
+    if not fixtures["cards"]:
+        print(f"No replayable cards in {fixtures_dir}")
+        return
+    out = os.path.abspath(args.out) if args.out else os.path.join(
+        fixtures_dir, f"bench-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json")
+
+    # The scraper writes progress files to the working directory; keep
+    # those out of the real output.
+    workdir = tempfile.mkdtemp(prefix="bench_scraper-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        report = await run_benchmark(fixtures, concurrency=args.concurrency,
+                                     extract_pages=args.extract_pages)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report["scale"] = args.scale
+    report["generated_at"] = datetime.utcnow().isoformat() + "Z"
+    print_report(report)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nReport -> {out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
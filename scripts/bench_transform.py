@@ -0,0 +1,345 @@
+"""
+Synthetic-registry benchmark for transform_mcp.py
+
+Generates mcp-raw-shaped pages at a given scale (duplicate uuids, relisted
+vendors, missing remotes, large htmlContent, connectors with hundreds of
+tools), then runs the transform pipeline on them stage by stage in a
+fresh process per scale and records time, peak RSS and tracemalloc peaks.
+
+Usage:
+  1. Default:    python3 bench_transform.py              (1k, 10k, 100k servers)
+  2. Scales:     python3 bench_transform.py --scales 1000,1000000
+  3. Keep data:  python3 bench_transform.py --data /tmp/mcp-synth
+     (Generated pages are reused on the next run with the same --data)
+  4. No memory:  python3 bench_transform.py --no-tracemalloc
+     (Skips the second, tracemalloc-instrumented pass per scale)
+  5. Artifacts:  python3 bench_transform.py --artifacts
+     (Also builds the search, facet and similarity artifacts, like
+      transform_mcp.py --index --facets --similar)
+
+Output: bench_transform-<timestamp>.json in the --data directory, else in
+the system temp directory (or --out PATH)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import transform_mcp as t
+import facets_mcp
+import search_mcp
+import similar_mcp
+
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+SERVERS_PER_PAGE = 10_000
+DUPLICATE_RATE = 0.02     # entries that repeat an earlier uuid
+RELISTED_RATE = 0.01      # new uuid, same connection URL (same vendor listed twice)
+NO_REMOTE_RATE = 0.10     # entries without "remotes"
+BIG_HTML_RATE = 0.20      # entries with a large htmlContent
+SEED = 1234
+
+WORDS = ("search list get create update delete sync export import query fetch send "
+         "meeting issue project calendar email file report invoice contact deal ticket "
+         "page database record user team channel message task event payment order").split()
+
+
+# ---------------------------------------------------------------------------
+# Synthetic registry
+# ---------------------------------------------------------------------------
+
+def load_templates() -> list:
+    """Real raw entries to mutate, so field shapes stay realistic."""
+    templates = []
+    for path in t.RAW_FILES:
+        if os.path.exists(path):
+            templates.extend(t.iter_servers(path))
+    return templates or [{
+        "server": {"name": "com.example/example", "title": "Example", "version": "1.0.0",
+                   "description": "Example connector",
+                   "remotes": [{"type": "streamable-http", "url": "https://example.com/mcp"}]},
+        "_meta": {t.REGISTRY_META_KEY: {"uuid": "", "displayName": "Example", "toolNames": []}},
+    }]
+
+
+def synthetic_uuid(i) -> str:
+    return f"00000000-0000-4000-8000-{i:012x}"
+
+
+def tool_name(rng) -> str:
+    words = rng.sample(WORDS, rng.randint(2, 3))
+    if rng.random() < 0.5:
+        return "".join(w.capitalize() for w in words)  # CamelCase
+    return "_".join(words)  # snake_case
+
+
+def synth_server(i, rng, templates) -> dict:
+    raw = json.loads(json.dumps(rng.choice(templates)))
+    server = raw.setdefault("server", {})
+    reg = raw.setdefault("_meta", {}).setdefault(t.REGISTRY_META_KEY, {})
+
+    # A few percent reuse an earlier uuid; dedup has to drop them
+    uuid_n = rng.randrange(i) if i and rng.random() < DUPLICATE_RATE else i
+    name = f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS).capitalize()} {i}"
+    reg["uuid"] = synthetic_uuid(uuid_n)
+    reg["displayName"] = name
+    reg["slug"] = name.lower().replace(" ", "-") if rng.random() < 0.6 else ""
+    server["name"] = f"com.synthetic.{i}/{reg['slug'] or i}"
+    server["version"] = f"1.{i % 10}.0"
+    host = rng.randrange(i) if i and rng.random() < RELISTED_RATE else i
+    reg["url"] = f"https://mcp.vendor-{host}.example/mcp"
+    for remote in server.get("remotes") or []:
+        remote["url"] = reg["url"]
+
+    # Heavy-tailed tool counts: most have a handful, some have hundreds
+    reg["toolNames"] = [tool_name(rng) for _ in range(min(int(rng.paretovariate(1.2) * 4), 400))]
+    if rng.random() < NO_REMOTE_RATE:
+        server.pop("remotes", None)
+    if rng.random() < BIG_HTML_RATE:
+        paragraphs = rng.randint(20, 400)
+        reg["htmlContent"] = "".join(
+            f"<p>{' '.join(rng.choice(WORDS) for _ in range(30))}</p>" for _ in range(paragraphs))
+    return raw
+
+
+def generate_registry(out_dir, scale, seed=SEED) -> list:
+    """Write `scale` synthetic servers as mcp-raw-page-NNNN.json files."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    templates = load_templates()
+    paths = []
+    for page, start in enumerate(range(0, scale, SERVERS_PER_PAGE), 1):
+        count = min(SERVERS_PER_PAGE, scale - start)
+        path = os.path.join(out_dir, f"mcp-raw-page-{page:04d}.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write('{"servers": [')
+            for i in range(start, start + count):
+                f.write(("," if i > start else "") + "\n" + json.dumps(synth_server(i, rng, templates)))
+            f.write(f'\n], "metadata": {{"count": {count}}}}}')
+        os.replace(path + ".tmp", path)
+        paths.append(path)
+    return paths
+
+
+def registry_for(data_dir, scale) -> str:
+    """Directory with the synthetic pages for `scale`, generated once."""
+    out_dir = os.path.join(data_dir, f"synthetic-{scale}")
+    marker = os.path.join(out_dir, "complete")
+    if not os.path.exists(marker):
+        shutil.rmtree(out_dir, ignore_errors=True)
+        started = time.monotonic()
+        generate_registry(out_dir, scale)
+        with open(marker, "w") as f:
+            f.write(str(scale))
+        print(f"  Generated {scale} servers in {time.monotonic() - started:.1f}s -> {out_dir}")
+    return out_dir
+
+
+# ---------------------------------------------------------------------------
+# Worker: one pipeline run on one synthetic registry
+# ---------------------------------------------------------------------------
+
+class StageTimer:
+    """Inclusive time spent pulling items through each wrapped generator."""
+
+    def __init__(self):
+        self.inclusive = {}
+
+    def wrap(self, name, iterable):
+        it = iter(iterable)
+        spent = 0.0
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                spent += time.perf_counter() - started
+                break
+            spent += time.perf_counter() - started
+            yield item
+        self.inclusive[name] = spent
+
+
+def run_pipeline(raw_dir, work_dir, trace=False, artifacts=False) -> dict:
+    """
+    The transform_mcp.main pipeline with explicit paths. Stage times are
+    exclusive (the stage's own work, not its upstream). With `trace`,
+    tracemalloc peaks are recorded per phase: the spill (load, dedup,
+    transform, sorted runs), the merge/write pass, and artifact builds.
+    With `artifacts`, the search, facet and similarity builders run too
+    (transform_mcp.py --index --facets --similar).
+    """
+    t.RAW_FILES = []
+    t.RAW_PAGE_GLOB = os.path.join(raw_dir, "mcp-raw-page-*.json")
+    timer = StageTimer()
+    phases = {}
+    changes = {"previous_run": False, "added": [], "removed": [], "modified": [],
+               "unchanged": 0, "reused": 0, "unkeyed": 0}
+    cache = t.TransformCache(path=os.path.join(work_dir, "cache.bin"))
+    runs_dir = os.path.join(work_dir, "runs")
+    os.makedirs(runs_dir, exist_ok=True)
+    output = os.path.join(work_dir, "mcp_connectors.json")
+    builders = [t.SummaryStats()]
+    if artifacts:
+        builders += [search_mcp.IndexBuilder(), facets_mcp.FacetBuilder(), similar_mcp.SimilarityBuilder()]
+
+    def phase_end(name):
+        if trace:
+            phases[name] = {"peak_mb": round(tracemalloc.get_traced_memory()[1] / 2**20, 1)}
+            tracemalloc.reset_peak()
+
+    if trace:
+        tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):  # per-file "Loaded ..." lines
+        servers = timer.wrap("load", t.load_raw_servers())
+        unique = timer.wrap("dedup", t.unique_servers(servers, key=t.entry_uuid))
+        connectors = timer.wrap("transform", t.transform_incremental(unique, cache, changes))
+        started = time.perf_counter()
+        runs, total = t.spill_sorted_runs(connectors, runs_dir)
+        spill = time.perf_counter() - started
+    phase_end("spill")
+
+    merged = timer.wrap("merge", t.merge_runs(runs))
+    fed = timer.wrap("artifacts", t.feed(merged, *builders))
+    started = time.perf_counter()
+    t.write_connectors(output, fed, total)
+    write = time.perf_counter() - started
+    phase_end("merge_write")
+
+    started = time.perf_counter()
+    if artifacts:
+        _, search, facets, similar = builders
+        search_mcp.write_index(search.build(), os.path.join(work_dir, "index.json"))
+        facets_mcp.write_facets(facets.build(), os.path.join(work_dir, "facets.json"))
+        similar_mcp.write_similar(similar.build(), os.path.join(work_dir, "similar.json"))
+    build = time.perf_counter() - started
+    cache.commit()
+    phase_end("build_artifacts")
+    if trace:
+        tracemalloc.stop()
+
+    inc = timer.inclusive
+    stages = {
+        "load": inc["load"],
+        "dedup": inc["dedup"] - inc["load"],
+        "transform": inc["transform"] - inc["dedup"],
+        "sort_runs": spill - inc["transform"],
+        "merge": inc["merge"],
+        "feed": inc["artifacts"] - inc["merge"],  # stats (+ index, facets, similarity builders)
+        "write": write - inc["artifacts"],
+        "build": build,  # index, facets, similarity documents (with --artifacts)
+    }
+    return {
+        "servers": total,
+        "sorted_runs": len(runs),
+        "output_mb": round(os.path.getsize(output) / 2**20, 1),
+        "stages_s": {k: round(v, 3) for k, v in stages.items()},
+        "total_s": round(spill + write + build, 3),
+        "phases": phases,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_worker(raw_dir, trace, artifacts=False) -> dict:
+    """Run the pipeline in a fresh process so peak RSS belongs to this scale."""
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", raw_dir]
+    if trace:
+        cmd.append("--trace")
+    if artifacts:
+        cmd.append("--artifacts")
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"worker failed on {raw_dir}:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def print_report(results):
+    print("\n--- Transform benchmark ---")
+    stages = list(results[0]["timing"]["stages_s"])
+    print(f"  {'servers':>9}  " + "  ".join(f"{s[:10]:>10}" for s in stages)
+          + f"  {'total s':>8}  {'srv/s':>8}  {'rss MB':>7}  {'heap MB':>7}")
+    for r in results:
+        timing = r["timing"]
+        rate = timing["servers"] / timing["total_s"] if timing["total_s"] else 0
+        heap = max((p["peak_mb"] for p in r.get("memory", {}).get("phases", {}).values()), default=None)
+        print(f"  {timing['servers']:>9}  "
+              + "  ".join(f"{timing['stages_s'][s]:>10.2f}" for s in stages)
+              + f"  {timing['total_s']:>8.2f}  {rate:>8.0f}  {timing['peak_rss_mb']:>7.0f}"
+              + (f"  {heap:>7.1f}" if heap is not None else f"  {'-':>7}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic-registry benchmark for transform_mcp.py")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="Comma-separated server counts (default: 1000,10000,100000)")
+    parser.add_argument("--data", help="Keep generated registries here and reuse them")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Skip the tracemalloc pass (time and RSS only)")
+    parser.add_argument("--artifacts", action="store_true",
+                        help="Also build the search, facet and similarity artifacts")
+    parser.add_argument("--out", help="Where to write the JSON report")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        work_dir = tempfile.mkdtemp(prefix="bench_transform-")
+        try:
+            print(json.dumps(run_pipeline(args.worker, work_dir, trace=args.trace, artifacts=args.artifacts)))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    data_dir = os.path.abspath(args.data) if args.data else tempfile.mkdtemp(prefix="mcp-synth-")
+    out = os.path.abspath(args.out) if args.out else os.path.join(
+        data_dir if args.data else tempfile.gettempdir(), f"bench_transform-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json")
+
+    results = []
+    try:
+        for scale in scales:
+            print(f"Scale {scale}:")
+            raw_dir = registry_for(data_dir, scale)
+            result = {"scale": scale, "timing": run_worker(raw_dir, trace=False, artifacts=args.artifacts)}
+            result["timing"]["duplicates_dropped"] = scale - result["timing"]["servers"]
+            print(f"  {result['timing']['servers']} servers in {result['timing']['total_s']}s, "
+                  f"peak RSS {result['timing']['peak_rss_mb']} MB")
+            if not args.no_tracemalloc:
+                result["memory"] = run_worker(raw_dir, trace=True, artifacts=args.artifacts)
+                print("  tracemalloc peaks: " + ", ".join(
+                    f"{k} {v['peak_mb']} MB" for k, v in result["memory"]["phases"].items()))
+            results.append(result)
+    finally:
+        if not args.data:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print_report(results)
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "artifacts": args.artifacts,
+        "sort_run_size": t.SORT_RUN_SIZE,
+        "servers_per_page": SERVERS_PER_PAGE,
+        "results": results,
+    }
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Facet aggregates over the transformed MCP connectors.
+
+transform_mcp.py --facets builds the facets in the same pass that writes
+mcp_connectors.json: for every facet value it stores a count and the ids
+of the connectors that have it. Filters are then answered by intersecting
+id bitsets instead of rescanning records.
+
+Usage:
+  1. Counts:   python3 facets_mcp.py
+  2. Filter:   python3 facets_mcp.py use_cases=productivity is_authless=true
+     (Values of one facet are OR-ed, different facets AND-ed; prints the
+      matches and the remaining counts per facet)
+
+Reads: mcp_facets.json (written by transform_mcp.py --facets)
+"""
+
+import argparse
+import json
+import os
+from collections import defaultdict
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FACETS_FILE = os.path.join(SCRIPT_DIR, "mcp_facets.json")
+FACETS_VERSION = 1
+
+
+def author_name(c) -> str:
+    return c["author"].get("name", "") if isinstance(c["author"], dict) else ""
+
+
+# Facet name -> values of a connector. Booleans become "true" / "false".
+FACETS = {
+    "use_cases": lambda c: c["capabilities"]["use_cases"],
+    "works_with": lambda c: c["capabilities"]["works_with"],
+    "transport": lambda c: [c["connection"]["transport"]],
+    "is_authless": lambda c: [c["connection"]["is_authless"]],
+    "has_mcp_app": lambda c: [c["capabilities"]["has_mcp_app"]],
+    "author": lambda c: [author_name(c)],
+    "has_html": lambda c: [bool(c["html_content"])],
+    "has_slug": lambda c: [bool(c["slug"])],
+    "has_use_cases": lambda c: [bool(c["capabilities"]["use_cases"])],
+    "has_claude_code_command": lambda c: [bool(c["connection"]["claude_code_command"])],
+    "has_hero_video": lambda c: [bool(c["branding"]["hero_video_id"])],
+    "has_images": lambda c: [bool(c["branding"]["images"])],
+}
+
+
+def facet_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+class FacetBuilder:
+    """Accumulates facet postings one connector at a time (see transform_mcp)."""
+
+    def __init__(self):
+        self.docs = []
+        self.postings = {name: defaultdict(list) for name in FACETS}
+        self.total_tools = 0
+
+    def add(self, c):
+        doc = len(self.docs)
+        self.docs.append(c["uuid"])
+        self.total_tools += len(c["capabilities"]["tools"])
+        for name, values in FACETS.items():
+            for value in dict.fromkeys(facet_value(v) for v in values(c)):
+                if value:
+                    self.postings[name][value].append(doc)
+
+    def build(self) -> dict:
+        """
+        The facets document: per facet, values by descending count, each
+        with its count and the ids (positions in `docs`) that have it.
+        """
+        return {
+            "version": FACETS_VERSION,
+            "total": len(self.docs),
+            "totals": {"tools": self.total_tools},
+            "docs": self.docs,
+            "facets": {
+                name: {
+                    value: {"count": len(ids), "ids": ids}
+                    for value, ids in sorted(values.items(), key=lambda kv: (-len(kv[1]), kv[0]))
+                }
+                for name, values in self.postings.items()
+            },
+        }
+
+
+def write_facets(facets, path=FACETS_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(facets, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_facets(path=FACETS_FILE) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        facets = json.load(f)
+    if facets.get("version") != FACETS_VERSION:
+        raise ValueError(f"{path}: facets version {facets.get('version')}, expected {FACETS_VERSION}")
+    return prepare(facets)
+
+
+def ids_bitset(ids, total) -> int:
+    """
+    Int bitset with bit i set for each id. Bits are set in a bytearray and
+    converted once; summing 1 << i would copy an ever-growing int per id.
+    """
+    bits = bytearray((total + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def prepare(facets) -> dict:
+    """Add an int bitset per facet value for fast intersection."""
+    facets["bitsets"] = {
+        name: {value: ids_bitset(entry["ids"], facets["total"]) for value, entry in values.items()}
+        for name, values in facets["facets"].items()
+    }
+    return facets
+
+
+# ---------------------------------------------------------------------------
+# Filtering
+# ---------------------------------------------------------------------------
+
+def select(facets, selection) -> int:
+    """
+    Bitset of the connectors matching `selection` ({facet: [values]}).
+    Values of one facet are OR-ed, different facets AND-ed.
+    """
+    result = (1 << facets["total"]) - 1
+    for name, values in selection.items():
+        bitsets = facets["bitsets"].get(name, {})
+        mask = 0
+        for value in values:
+            mask |= bitsets.get(facet_value(value), 0)
+        result &= mask
+    return result
+
+
+def bitset_ids(bits) -> list:
+    """Set bit positions, ascending. Reads the bytes once instead of shifting the int."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    return [i * 8 + j for i, byte in enumerate(data) if byte for j in range(8) if byte >> j & 1]
+
+
+def filter_uuids(facets, selection) -> list:
+    """uuids of the connectors matching `selection`, in output order."""
+    return [facets["docs"][i] for i in bitset_ids(select(facets, selection))]
+
+
+def facet_counts(facets, selection=None) -> dict:
+    """
+    Counts per facet value within `selection`, for drill-down filter UIs.
+    Each facet is counted against the selection on the *other* facets, so
+    picking one value doesn't hide its alternatives.
+    """
+    selection = selection or {}
+    counts = {}
+    for name, bitsets in facets["bitsets"].items():
+        base = select(facets, {k: v for k, v in selection.items() if k != name})
+        counts[name] = {value: (bits & base).bit_count() for value, bits in bitsets.items()
+                        if bits & base}
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Facet counts and filters for MCP connectors")
+    parser.add_argument("filters", nargs="*", metavar="FACET=VALUE",
+                        help=f"Facets: {', '.join(FACETS)}")
+    parser.add_argument("--top", type=int, default=5, help="Values shown per facet (default: 5)")
+    args = parser.parse_args()
+
+    if not os.path.exists(FACETS_FILE):
+        print(f"No facets at {FACETS_FILE}. Run transform_mcp.py --facets first.")
+        return
+    facets = load_facets()
+
+    selection = defaultdict(list)
+    for item in args.filters:
+        name, _, value = item.partition("=")
+        if name not in FACETS:
+            parser.error(f"unknown facet {name!r}")
+        selection[name].append(value)
+
+    if selection:
+        print(f"{len(filter_uuids(facets, selection))} of {facets['total']} connectors match")
+    for name, values in facet_counts(facets, selection).items():
+        top = sorted(values.items(), key=lambda kv: (-kv[1], kv[0]))[:args.top]
+        print(f"  {name:<24} " + ", ".join(f"{v} ({n})" for v, n in top))
+
+
+if __name__ == "__main__":
+    main()
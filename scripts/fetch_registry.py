@@ -0,0 +1,345 @@
+"""
+Fetch the MCP registry page by page into numbered raw files for
+transform_mcp.py.
+
+Follows metadata.nextCursor through the registry API over a small pool of
+keep-alive connections. Every page is cached on disk with its ETag /
+Last-Modified and revalidated with conditional requests; the pages seen by
+the previous run are revalidated in parallel before the cursor chain is
+walked, so an unchanged registry costs one round of 304s.
+
+Usage:
+  1. Fetch:      python3 fetch_registry.py
+  2. Transform:  python3 transform_mcp.py
+  3. Offline:    python3 fetch_registry.py --serve-stub 8765
+                 python3 fetch_registry.py --registry http://127.0.0.1:8765/v0/servers
+     (The stub serves mcp-raw.json / mcp-raw-2.json as a paginated registry
+      with ETags)
+
+Writes: mcp-raw-page-0001.json, mcp-raw-page-0002.json, ... (read by transform_mcp.py)
+Cache:  .registry_cache/
+"""
+
+import asyncio
+import argparse
+import glob
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import random
+import shutil
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlparse
+
+from http_pool import ConnectionPool
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REGISTRY_URL = "https://api.anthropic.com/mcp-registry/v0/servers?version=latest"
+PAGE_LIMIT = 100
+PAGE_FILE = "mcp-raw-page-{:04d}.json"
+PAGE_GLOB = "mcp-raw-page-*.json"
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".registry_cache")
+CACHE_INDEX = os.path.join(CACHE_DIR, "index.json")
+POOL_SIZE = 4          # keep-alive connections / pages in flight
+TIMEOUT = 30           # seconds per request
+MAX_ATTEMPTS = 3       # per page, for network errors, 429 and 5xx
+BACKOFF_BASE = 1.0
+MAX_PAGES = 10_000     # guard against a cursor loop
+USER_AGENT = "claudeai-directory/fetch_registry"
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+def page_path(url, cursor="", limit=PAGE_LIMIT) -> str:
+    """Request path (with query) for the page starting at `cursor`."""
+    parsed = urlparse(url)
+    params = [(k, v) for k, v in parse_qsl(parsed.query) if k not in ("cursor", "limit")]
+    params.append(("limit", str(limit)))
+    if cursor:
+        params.append(("cursor", cursor))
+    return f"{parsed.path or '/'}?{urlencode(params)}"
+
+
+# ---------------------------------------------------------------------------
+# Page cache
+# ---------------------------------------------------------------------------
+
+def cache_key(path) -> str:
+    return hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_body_path(key) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def load_cache_index() -> dict:
+    """Cached pages keyed by cache_key(path)."""
+    try:
+        with open(CACHE_INDEX, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_cache_index(index):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = CACHE_INDEX + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, CACHE_INDEX)
+
+
+def write_atomic(path, body: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+
+def known_chain(index, url, limit) -> list:
+    """Cursors of the page chain a previous run walked, first page first."""
+    cursors, cursor = [], ""
+    while len(cursors) < MAX_PAGES:
+        entry = index.get(cache_key(page_path(url, cursor, limit)))
+        if not entry or cursor in cursors:
+            break
+        cursors.append(cursor)
+        cursor = entry.get("next_cursor") or ""
+        if not cursor:
+            break
+    return cursors
+
+
+# ---------------------------------------------------------------------------
+# Fetching
+# ---------------------------------------------------------------------------
+
+async def fetch_page(pool, url, cursor, limit, index, stats) -> dict:
+    """
+    Fetch one page, revalidating the cached copy if there is one.
+    Returns the decoded page; its body is left in the cache.
+    """
+    path = page_path(url, cursor, limit)
+    key = cache_key(path)
+    entry = index.get(key)
+    body_path = cache_body_path(key)
+
+    headers = {"Accept": "application/json", "Accept-Encoding": "gzip", "User-Agent": USER_AGENT}
+    conditional = bool(entry) and os.path.exists(body_path)
+    if conditional:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    error = ""
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            status, resp_headers, body = await asyncio.to_thread(pool.request, path, headers)
+        except (http.client.HTTPException, OSError) as e:
+            error = f"{type(e).__name__}: {e}"
+        else:
+            if status == 304 and conditional:
+                stats["not_modified"] += 1
+                with open(body_path, "rb") as f:
+                    return json.loads(f.read())
+            if status == 200:
+                if resp_headers.get("content-encoding") == "gzip":
+                    body = gzip.decompress(body)
+                data = json.loads(body)
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                write_atomic(body_path, body)
+                index[key] = {
+                    "registry": url,
+                    "cursor": cursor,
+                    "next_cursor": (data.get("metadata") or {}).get("nextCursor") or "",
+                    "etag": resp_headers.get("etag", ""),
+                    "last_modified": resp_headers.get("last-modified", ""),
+                    "fetched_at": datetime.utcnow().isoformat() + "Z",
+                }
+                stats["fetched"] += 1
+                stats["bytes"] += len(body)
+                return data
+            error = f"HTTP {status}"
+            if status != 429 and status < 500:
+                break
+        if attempt < MAX_ATTEMPTS:
+            stats["retries"] += 1
+            await asyncio.sleep(BACKOFF_BASE * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+    raise RuntimeError(f"page {cursor or '(first)'}: {error}")
+
+
+async def fetch_registry(url=REGISTRY_URL, limit=PAGE_LIMIT, concurrency=POOL_SIZE, use_cache=True):
+    """
+    Walk the registry's cursor chain. Returns (page cache keys in order, stats).
+    """
+    index = load_cache_index() if use_cache else {}
+    pool = ConnectionPool(url, size=concurrency, timeout=TIMEOUT)
+    stats = Counter()
+    pages = {}
+    keys = []
+    try:
+        # Revalidate the previous chain in parallel; the pool bounds how
+        # many requests are actually in flight
+        known = known_chain(index, url, limit)
+        if known:
+            print(f"  Revalidating {len(known)} cached pages ({concurrency} connections)...")
+            results = await asyncio.gather(
+                *(fetch_page(pool, url, c, limit, index, stats) for c in known),
+                return_exceptions=True,
+            )
+            pages = {c: r for c, r in zip(known, results) if not isinstance(r, Exception)}
+
+        # Walk from the first page; pages the chain moved to are fetched here
+        cursor, seen = "", set()
+        while True:
+            data = pages.get(cursor)
+            if data is None:
+                data = await fetch_page(pool, url, cursor, limit, index, stats)
+            keys.append(cache_key(page_path(url, cursor, limit)))
+            seen.add(cursor)
+            print(f"  Page {len(keys)}: {len(data.get('servers', []))} servers")
+            cursor = (data.get("metadata") or {}).get("nextCursor") or ""
+            if not cursor:
+                break
+            if cursor in seen or len(keys) >= MAX_PAGES:
+                raise RuntimeError(f"cursor chain loops or exceeds {MAX_PAGES} pages at {cursor!r}")
+
+        # Forget pages of this registry that are no longer on the chain
+        for key in [k for k, e in index.items() if e.get("registry") == url and k not in keys]:
+            del index[key]
+            try:
+                os.remove(cache_body_path(key))
+            except OSError:
+                pass
+    finally:
+        pool.close()
+        stats["connections"] = pool.opened
+        save_cache_index(index)
+    return keys, stats
+
+
+def write_pages(keys, out_dir=SCRIPT_DIR) -> list:
+    """Copy cached page bodies to numbered raw files; drop stale ones."""
+    written = []
+    for i, key in enumerate(keys, 1):
+        path = os.path.join(out_dir, PAGE_FILE.format(i))
+        shutil.copyfile(cache_body_path(key), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        written.append(path)
+    for path in glob.glob(os.path.join(out_dir, PAGE_GLOB)):
+        if path not in written:
+            os.remove(path)
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Stub registry (offline runs)
+# ---------------------------------------------------------------------------
+
+def serve_stub(port, limit=PAGE_LIMIT):
+    """Serve the hand-saved raw files as a cursor-paginated registry with ETags."""
+    import transform_mcp
+
+    servers = []
+    for path in transform_mcp.RAW_FILES:
+        if os.path.exists(path):
+            servers.extend(transform_mcp.iter_servers(path))
+    servers = list(transform_mcp.unique_servers(servers))
+    cursors = {f"{s['server'].get('name', '')}:{s['server'].get('version', '')}": i
+               for i, s in enumerate(servers)}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            size = int(query.get("limit", [limit])[0])
+            cursor = query.get("cursor", [""])[0]
+            if cursor and cursor not in cursors:
+                return self.reply(400, b'{"error": "unknown cursor"}')
+            start = cursors[cursor] + 1 if cursor else 0
+            page = servers[start:start + size]
+            metadata = {"count": len(page)}
+            if start + size < len(servers):
+                last = page[-1]["server"]
+                metadata["nextCursor"] = f"{last.get('name', '')}:{last.get('version', '')}"
+            body = json.dumps({"servers": page, "metadata": metadata}, indent=2).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                return self.reply(304, b"", etag)
+            self.reply(200, body, etag)
+
+        def reply(self, status, body, etag=""):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if etag:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            print(f"  {self.address_string()} {fmt % args}")
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    print(f"Stub registry: {len(servers)} servers at http://127.0.0.1:{port}/v0/servers (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch the MCP registry into raw pages for transform_mcp.py")
+    parser.add_argument("--registry", default=REGISTRY_URL,
+                        help=f"Registry servers endpoint (default: {REGISTRY_URL})")
+    parser.add_argument("--limit", type=int, default=PAGE_LIMIT,
+                        help=f"Servers per page (default: {PAGE_LIMIT})")
+    parser.add_argument("--concurrency", type=int, default=POOL_SIZE,
+                        help=f"Connections / pages in flight (default: {POOL_SIZE})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore cached pages and refetch everything")
+    parser.add_argument("--serve-stub", type=int, metavar="PORT",
+                        help="Serve the hand-saved raw files as a local registry instead")
+    args = parser.parse_args()
+
+    if args.serve_stub:
+        serve_stub(args.serve_stub, args.limit)
+        return
+
+    print(f"Fetching {args.registry} ...")
+    started = time.monotonic()
+    try:
+        keys, stats = asyncio.run(fetch_registry(args.registry, limit=args.limit,
+                                                 concurrency=max(1, args.concurrency),
+                                                 use_cache=not args.no_cache))
+    except RuntimeError as e:
+        print(f"Fetch failed, existing raw pages left as they were: {e}")
+        return
+    written = write_pages(keys)
+    elapsed = time.monotonic() - started
+
+    print(f"\nWrote {len(written)} pages -> {os.path.join(SCRIPT_DIR, PAGE_GLOB)}")
+    print(f"  Fetched:       {stats['fetched']} ({stats['bytes'] / 1024:.0f} KB)")
+    print(f"  Not modified:  {stats['not_modified']}")
+    print(f"  Retries:       {stats['retries']}")
+    print(f"  Connections:   {stats['connections']}")
+    print(f"  Time:          {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Pooled keep-alive HTTP(S) connections shared by fetch_registry.py,
+probe_health.py and mirror_assets.py.
+
+ConnectionPool holds the idle connections to one host; HostPools keeps one
+ConnectionPool per scheme://host for scripts that talk to many hosts.
+
+Usage:
+  from http_pool import ConnectionPool, HostPools
+"""
+
+import http.client
+import queue
+import threading
+from urllib.parse import urlparse
+
+POOL_SIZE = 4          # keep-alive connections per host
+TIMEOUT = 30           # seconds per request
+
+
+# ---------------------------------------------------------------------------
+# HTTP: pooled keep-alive connections
+# ---------------------------------------------------------------------------
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, shared by worker threads."""
+
+    def __init__(self, url, size=POOL_SIZE, timeout=TIMEOUT):
+        parsed = urlparse(url)
+        self.https = parsed.scheme == "https"
+        self.host = parsed.netloc
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.opened = 0
+
+    def _connect(self):
+        self.opened += 1
+        if self.https:
+            return http.client.HTTPSConnection(self.host, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, timeout=self.timeout)
+
+    def request(self, path, headers, method="GET", body=None):
+        """
+        Send one request; returns (status, lowercased headers, body bytes).
+        An event stream may never end, so only its headers are read and its
+        connection is dropped.
+        """
+        with self.slots:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+                if resp_headers.get("content-type", "").startswith("text/event-stream"):
+                    conn.close()
+                    return resp.status, resp_headers, b""
+                content = resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self.idle.put(conn)
+            return resp.status, resp_headers, content
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class HostPools:
+    """One ConnectionPool per scheme://host, created on first use."""
+
+    def __init__(self, per_host=POOL_SIZE, timeout=TIMEOUT):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.pools = {}
+
+    def get(self, url) -> ConnectionPool:
+        parsed = urlparse(url)
+        key = f"{parsed.scheme}://{parsed.netloc}"
+        if key not in self.pools:
+            self.pools[key] = ConnectionPool(url, size=self.per_host, timeout=self.timeout)
+        return self.pools[key]
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
@@ -0,0 +1,327 @@
+"""
+Mirror connector logos, icons and promo images locally.
+
+Downloads every asset URL in a connector file (transform_mcp.py output or
+scrap_connectors.py output) through a bounded pool of keep-alive
+connections, stores each one under its content hash, revalidates on later
+runs with ETag / Last-Modified, makes thumbnails (when Pillow is
+installed) and rewrites the records to point at the local copies.
+
+Icons: branding.icon_url is the vendor's site, so its /favicon.ico is
+mirrored. Values that aren't URLs (branding.logo is usually a name) are
+left alone.
+
+Usage:
+  1. Mirror:    python3 mirror_assets.py                    (after transform_mcp.py; rewrites mcp_connectors.json)
+  2. Elsewhere: python3 mirror_assets.py --out /tmp/mcp_connectors.json
+  3. Offline:   python3 -m http.server 8000 -d some/dir     (any static server works)
+                then point a connector file's URLs at http://127.0.0.1:8000/...
+
+Writes: ../public/mcp-assets/<sha256>.<ext>, <sha256>-<size>.png thumbnails,
+        ../public/mcp-assets/index.json (per-URL cache: file, ETag, Last-Modified)
+Records: asset URLs become /mcp-assets/<file>; each connector gets an
+         "assets" map from field path (e.g. branding.images.0.imageUrl) to
+         {url, original, content_type, thumbnails}, so reruns find the originals
+"""
+
+import asyncio
+import argparse
+import hashlib
+import http.client
+import io
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+
+from http_pool import HostPools
+
+try:
+    from PIL import Image  # optional: pip install Pillow
+except ImportError:
+    Image = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_FILE = os.path.join(SCRIPT_DIR, "mcp_connectors.json")
+ASSET_DIR = os.path.join(SCRIPT_DIR, "..", "public", "mcp-assets")
+BASE_URL = "/mcp-assets/"   # where the Next.js app serves ASSET_DIR
+CONCURRENCY = 16            # downloads in flight overall
+PER_HOST = 4                # keep-alive connections per host
+TIMEOUT = 15
+MAX_REDIRECTS = 5
+MAX_BYTES = 10 * 2**20
+THUMB_SIZES = (64, 256)
+USER_AGENT = "claudeai-directory/mirror_assets"
+
+CONTENT_TYPES = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+    "image/svg+xml": ".svg",
+    "image/x-icon": ".ico",
+    "image/vnd.microsoft.icon": ".ico",
+}
+
+
+# ---------------------------------------------------------------------------
+# Records
+# ---------------------------------------------------------------------------
+
+def is_url(value) -> bool:
+    return isinstance(value, str) and urlparse(value).scheme in ("http", "https")
+
+
+def original_url(c, path, value):
+    """The remote URL behind a field, which may already hold the local copy."""
+    mirrored = c.get("assets", {}).get(path, {})
+    return mirrored["original"] if mirrored.get("url") == value else value
+
+
+def asset_fields(c) -> list:
+    """(container, key, kind, path) of every asset URL in a connector record."""
+    fields = []
+    if "logo_url" in c:  # scrap_connectors.py shape
+        fields.append((c, "logo_url", "image", "logo_url"))
+    branding = c.get("branding")
+    if isinstance(branding, dict):
+        fields.append((branding, "icon_url", "icon", "branding.icon_url"))
+        fields.append((branding, "logo", "image", "branding.logo"))
+        images = branding.get("images") or []
+        for i, image in enumerate(images):
+            if isinstance(image, dict):
+                fields.append((image, "imageUrl", "image", f"branding.images.{i}.imageUrl"))
+            else:
+                fields.append((images, i, "image", f"branding.images.{i}"))
+    return [(obj, key, kind, path) for obj, key, kind, path in fields
+            if is_url(original_url(c, path, obj[key] if isinstance(obj, list) else obj.get(key)))]
+
+
+def source_url(url, kind) -> str:
+    """URL to download: a site URL given as an icon means its favicon."""
+    if kind == "icon" and not os.path.splitext(urlparse(url).path)[1]:
+        return urljoin(url, "/favicon.ico")
+    return url
+
+
+# ---------------------------------------------------------------------------
+# Cache index
+# ---------------------------------------------------------------------------
+
+def load_asset_index(asset_dir) -> dict:
+    """Mirrored assets keyed by source URL."""
+    try:
+        with open(os.path.join(asset_dir, "index.json"), "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_asset_index(asset_dir, index):
+    path = os.path.join(asset_dir, "index.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+# ---------------------------------------------------------------------------
+# Downloading
+# ---------------------------------------------------------------------------
+
+def request_path(url) -> str:
+    parsed = urlparse(url)
+    return (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+
+
+async def fetch(pools, url, headers):
+    """GET following redirects. Returns (status, headers, body, final URL)."""
+    for _ in range(MAX_REDIRECTS + 1):
+        status, resp_headers, body = await asyncio.to_thread(
+            pools.get(url).request, request_path(url), headers)
+        if status in (301, 302, 303, 307, 308) and resp_headers.get("location"):
+            url = urljoin(url, resp_headers["location"])
+            continue
+        return status, resp_headers, body, url
+    raise RuntimeError(f"more than {MAX_REDIRECTS} redirects")
+
+
+def make_thumbnails(body, digest, asset_dir) -> dict:
+    """PNG thumbnails per THUMB_SIZES (needs Pillow; skips SVG and failures)."""
+    if Image is None:
+        return {}
+    thumbs = {}
+    try:
+        with Image.open(io.BytesIO(body)) as img:
+            img.load()
+            for size in THUMB_SIZES:
+                name = f"{digest}-{size}.png"
+                path = os.path.join(asset_dir, name)
+                if not os.path.exists(path):
+                    thumb = img.convert("RGBA")
+                    thumb.thumbnail((size, size))
+                    thumb.save(path + ".tmp", format="PNG", optimize=True)
+                    os.replace(path + ".tmp", path)
+                thumbs[str(size)] = name
+    except Exception:
+        return {}
+    return thumbs
+
+
+def store(body, content_type, asset_dir, stats) -> dict:
+    """Write `body` under its content hash; identical content is stored once."""
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    name = digest + CONTENT_TYPES[content_type]
+    path = os.path.join(asset_dir, name)
+    if os.path.exists(path):
+        stats["same_content"] += 1
+    else:
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+        stats["bytes"] += len(body)
+    thumbs = make_thumbnails(body, digest, asset_dir) if not name.endswith(".svg") else {}
+    stats["thumbnails"] += len(thumbs)
+    return {"file": name, "sha256": digest, "content_type": content_type,
+            "bytes": len(body), "thumbnails": thumbs}
+
+
+async def mirror_url(url, index, pools, limit, asset_dir, stats):
+    """Download or revalidate one URL and update its index entry."""
+    entry = index.get(url, {})
+    have_file = bool(entry.get("file")) and os.path.exists(os.path.join(asset_dir, entry["file"]))
+    headers = {"User-Agent": USER_AGENT, "Accept": "image/*"}
+    if have_file:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    async with limit:
+        try:
+            status, resp_headers, body, final_url = await fetch(pools, url, headers)
+        except (http.client.HTTPException, OSError, RuntimeError) as e:
+            stats["failed"] += 1
+            index[url] = {**entry, "error": f"{type(e).__name__}: {e}",
+                          "checked_at": datetime.utcnow().isoformat() + "Z"}
+            return
+
+    checked = {"checked_at": datetime.utcnow().isoformat() + "Z"}
+    if status == 304 and have_file:
+        stats["not_modified"] += 1
+        index[url] = {**entry, **checked, "error": ""}
+        return
+    content_type = resp_headers.get("content-type", "").split(";")[0].strip().lower()
+    if status != 200:
+        error = f"HTTP {status}"
+    elif content_type not in CONTENT_TYPES:
+        error = f"not an image ({content_type or 'no content type'})"
+        stats["not_image"] += 1
+    elif len(body) > MAX_BYTES:
+        error = f"too large ({len(body)} bytes)"
+    else:
+        stored = store(body, content_type, asset_dir, stats)
+        stats["downloaded"] += 1
+        index[url] = {**stored, **checked, "error": "", "final_url": final_url,
+                      "etag": resp_headers.get("etag", ""),
+                      "last_modified": resp_headers.get("last-modified", "")}
+        return
+    if error.startswith("HTTP"):
+        stats["failed"] += 1
+    # Keep a previously mirrored copy if the source breaks
+    index[url] = {**entry, **checked, "error": error}
+
+
+async def mirror_assets(urls, index, asset_dir, concurrency=CONCURRENCY, per_host=PER_HOST):
+    pools = HostPools(per_host, TIMEOUT)
+    limit = asyncio.Semaphore(concurrency)
+    stats = Counter()
+    try:
+        await asyncio.gather(*(mirror_url(u, index, pools, limit, asset_dir, stats) for u in urls))
+    finally:
+        pools.close()
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Rewriting
+# ---------------------------------------------------------------------------
+
+def rewrite(connectors, index, base_url=BASE_URL) -> int:
+    """Point asset fields at local copies; returns how many were rewritten."""
+    rewritten = 0
+    for c in connectors:
+        assets = {}
+        for obj, key, kind, path in asset_fields(c):
+            original = original_url(c, path, obj[key])
+            entry = index.get(source_url(original, kind), {})
+            if not entry.get("file"):
+                obj[key] = original  # nothing local (yet): keep the remote URL
+                continue
+            local = base_url + entry["file"]
+            obj[key] = local
+            assets[path] = {
+                "url": local,
+                "original": original,
+                "content_type": entry["content_type"],
+                "thumbnails": {size: base_url + name for size, name in entry.get("thumbnails", {}).items()},
+            }
+            rewritten += 1
+        if assets:
+            c["assets"] = assets
+        else:
+            c.pop("assets", None)
+    return rewritten
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror connector images locally and rewrite the records")
+    parser.add_argument("--input", default=INPUT_FILE, help="Connector file to read (default: mcp_connectors.json)")
+    parser.add_argument("--out", help="Where to write the rewritten file (default: --input)")
+    parser.add_argument("--asset-dir", default=ASSET_DIR, help="Where mirrored files go")
+    parser.add_argument("--base-url", default=BASE_URL, help=f"URL prefix of --asset-dir (default: {BASE_URL})")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help=f"Downloads in flight (default: {CONCURRENCY})")
+    parser.add_argument("--per-host", type=int, default=PER_HOST,
+                        help=f"Connections per host (default: {PER_HOST})")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    connectors = document.get("connectors", [])
+    asset_dir = os.path.abspath(args.asset_dir)
+    os.makedirs(asset_dir, exist_ok=True)
+
+    urls = sorted({source_url(original_url(c, path, obj[key]), kind)
+                   for c in connectors for obj, key, kind, path in asset_fields(c)})
+    print(f"Mirroring {len(urls)} asset URLs from {len(connectors)} connectors "
+          f"({args.concurrency} in flight, {args.per_host} per host)...")
+
+    index = load_asset_index(asset_dir)
+    started = time.monotonic()
+    stats = asyncio.run(mirror_assets(urls, index, asset_dir,
+                                      concurrency=max(1, args.concurrency),
+                                      per_host=max(1, args.per_host)))
+    save_asset_index(asset_dir, index)
+    elapsed = time.monotonic() - started
+
+    rewritten = rewrite(connectors, index, args.base_url)
+    out = args.out or args.input
+    with open(out + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    os.replace(out + ".tmp", out)
+
+    print(f"\n--- Assets ({elapsed:.1f}s) ---")
+    print(f"  Downloaded:     {stats['downloaded']} ({stats['bytes'] / 1024:.0f} KB new)")
+    print(f"  Not modified:   {stats['not_modified']}")
+    print(f"  Same content:   {stats['same_content']}")
+    print(f"  Not an image:   {stats['not_image']}")
+    print(f"  Failed:         {stats['failed']}")
+    print(f"  Thumbnails:     {stats['thumbnails']}" + ("" if Image else " (pip install Pillow to generate)"))
+    print(f"  Rewrote {rewritten} fields -> {out}")
+
+
+if __name__ == "__main__":
+    main()
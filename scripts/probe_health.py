@@ -0,0 +1,428 @@
+"""
+Probe the remote MCP endpoints of every connector and record their health.
+
+Each endpoint is checked the way its transport is spoken: streamable-http
+gets a JSON-RPC `initialize` POST, sse a GET for the event stream (only the
+response headers are read). Probes run concurrently over per-host pools of
+keep-alive connections with a per-host cap and short timeouts. Results go
+into a cache with a TTL, so a rerun only probes the stale endpoints, and
+the latency percentiles come from the recent samples kept there.
+
+Status: up (2xx), auth_required (401/403: reachable, needs credentials),
+        error (other 4xx, or not speaking the transport), down (5xx),
+        unreachable (timeout / connection error). URLs the user fills in
+        (e.g. "{url}") aren't probed.
+
+Usage:
+  1. Probe:    python3 probe_health.py                    (after transform_mcp.py)
+  2. Recheck:  python3 probe_health.py --force            (ignore the TTL)
+  3. Offline:  python3 probe_health.py --serve-stub 8766 --stub-input /tmp/stub_connectors.json
+               python3 probe_health.py --input /tmp/stub_connectors.json --health /tmp/mcp_health.json
+     (The stub answers like healthy, auth-only, broken, failing and slow
+      MCP servers on both transports)
+
+Reads:  mcp_connectors.json (connection.url / connection.transport) or
+        scrap_connectors.py output (connector_url)
+Writes: mcp_health.json (per endpoint URL; transform_mcp.py attaches it to
+        each connector as "health"), "health" on every record of --input
+Cache:  .health_cache.json
+"""
+
+import asyncio
+import argparse
+import http.client
+import json
+import math
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from http_pool import HostPools
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_FILE = os.path.join(SCRIPT_DIR, "mcp_connectors.json")
+HEALTH_FILE = os.path.join(SCRIPT_DIR, "mcp_health.json")
+CACHE_FILE = os.path.join(SCRIPT_DIR, ".health_cache.json")
+CONCURRENCY = 32        # probes in flight overall
+PER_HOST = 2            # probes in flight per host (many connectors share a vendor host)
+TIMEOUT = 5             # seconds per probe
+SAMPLES = 3             # probes per endpoint per run
+HISTORY = 20            # latency samples kept per endpoint for the percentiles
+TTL = 6 * 3600          # seconds before an endpoint is probed again
+PROTOCOL_VERSION = "2025-06-18"
+USER_AGENT = "claudeai-directory/probe_health"
+
+INITIALIZE = json.dumps({
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": PROTOCOL_VERSION,
+        "capabilities": {},
+        "clientInfo": {"name": "claudeai-directory-probe", "version": "1.0"},
+    },
+}).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
+
+def endpoint(c):
+    """(url, transport) of a connector in either the transform or scraper shape."""
+    connection = c.get("connection") or {}
+    url = connection.get("url") or c.get("connector_url") or ""
+    transport = connection.get("transport") or ("sse" if urlparse(url).path.rstrip("/").endswith("/sse")
+                                                else "streamable-http")
+    return url, transport
+
+
+def probeable(url) -> bool:
+    """Real http(s) URLs only; "{url}" and friends are filled in per user."""
+    return urlparse(url).scheme in ("http", "https") and "{" not in url
+
+
+def request_path(url) -> str:
+    parsed = urlparse(url)
+    return (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+
+
+def classify(transport, status, headers) -> str:
+    if status in (401, 403):
+        return "auth_required"
+    if status >= 500:
+        return "down"
+    if not 200 <= status < 300:
+        return "error"
+    content_type = headers.get("content-type", "")
+    if transport == "sse" and not content_type.startswith("text/event-stream"):
+        return "error"
+    if transport != "sse" and not content_type.startswith(("application/json", "text/event-stream")):
+        return "error"
+    return "up"
+
+
+# ---------------------------------------------------------------------------
+# Probing
+# ---------------------------------------------------------------------------
+
+def probe_once(pool, url, transport) -> dict:
+    """One timed request in the endpoint's transport (runs in a worker thread)."""
+    path = request_path(url)
+    headers = {"User-Agent": USER_AGENT}
+    if transport == "sse":
+        method, body = "GET", None
+        headers["Accept"] = "text/event-stream"
+    else:
+        method, body = "POST", INITIALIZE
+        headers.update({"Accept": "application/json, text/event-stream",
+                        "Content-Type": "application/json",
+                        "MCP-Protocol-Version": PROTOCOL_VERSION})
+    started = time.perf_counter()
+    try:
+        status, resp_headers, _ = pool.request(path, headers, method=method, body=body)
+    except (http.client.HTTPException, OSError) as e:
+        return {"status": "unreachable", "http_status": 0, "error": f"{type(e).__name__}: {e}"}
+    latency = (time.perf_counter() - started) * 1000
+
+    session = resp_headers.get("mcp-session-id")
+    if session:
+        # Don't leave a session open on the server for every probe
+        try:
+            pool.request(path, {"User-Agent": USER_AGENT, "Mcp-Session-Id": session}, method="DELETE")
+        except (http.client.HTTPException, OSError):
+            pass
+    state = classify(transport, status, resp_headers)
+    return {"status": state, "http_status": status, "latency_ms": round(latency, 1),
+            "error": "" if state in ("up", "auth_required") else f"HTTP {status} {resp_headers.get('content-type', '')}".strip()}
+
+
+async def probe_endpoint(url, transport, pools, limit, host_limits, samples):
+    """Probe `url` `samples` times, one request at a time, under both caps."""
+    host = urlparse(url).netloc
+    if host not in host_limits:
+        host_limits[host] = asyncio.Semaphore(pools.per_host)
+    results = []
+    # Host slot first, so endpoints queued on a busy host don't hold global slots
+    async with host_limits[host], limit:
+        for _ in range(samples):
+            result = await asyncio.to_thread(probe_once, pools.get(url), url, transport)
+            results.append(result)
+            if result["status"] == "unreachable":
+                break  # one timeout per run is enough
+    return results
+
+
+def percentile(samples, q) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def record(entry, transport, results) -> dict:
+    """Fold a run's probes into an endpoint's cache entry."""
+    last = results[-1]
+    history = (entry.get("latencies", []) + [r["latency_ms"] for r in results if "latency_ms" in r])[-HISTORY:]
+    return {
+        "transport": transport,
+        "status": last["status"],
+        "http_status": last["http_status"],
+        "error": last["error"],
+        "latencies": history,
+        "checked_at": time.time(),
+        # Last time the endpoint answered at all, to tell flaps from dead servers
+        "last_reachable_at": time.time() if last["status"] != "unreachable" else entry.get("last_reachable_at", 0),
+    }
+
+
+async def probe_all(endpoints, cache, ttl=TTL, force=False, concurrency=CONCURRENCY,
+                    per_host=PER_HOST, timeout=TIMEOUT, samples=SAMPLES):
+    """Probe every stale endpoint ({url: transport}); updates `cache` in place."""
+    now = time.time()
+    stale = {url: transport for url, transport in endpoints.items()
+             if force or cache.get(url, {}).get("transport") != transport
+             or now - cache.get(url, {}).get("checked_at", 0) > ttl}
+    pools = HostPools(per_host, timeout)
+    limit = asyncio.Semaphore(concurrency)
+    host_limits = {}
+    try:
+        runs = await asyncio.gather(*(probe_endpoint(url, transport, pools, limit, host_limits, samples)
+                                      for url, transport in stale.items()))
+    finally:
+        pools.close()
+    for (url, transport), results in zip(stale.items(), runs):
+        cache[url] = record(cache.get(url, {}), transport, results)
+    return len(stale)
+
+
+# ---------------------------------------------------------------------------
+# Cache and artifact
+# ---------------------------------------------------------------------------
+
+def load_cache(path=CACHE_FILE) -> dict:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def write_json(path, data, **kwargs):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+    os.replace(tmp, path)
+
+
+def health_entry(entry) -> dict:
+    """What the directory shows for an endpoint: status plus latency percentiles."""
+    latencies = entry.get("latencies", [])
+    return {
+        "status": entry["status"],
+        "transport": entry["transport"],
+        "http_status": entry["http_status"],
+        "latency_ms": {
+            "p50": percentile(latencies, 0.5),
+            "p95": percentile(latencies, 0.95),
+            "samples": len(latencies),
+        } if latencies else None,
+        "error": entry["error"],
+        "checked_at": datetime.utcfromtimestamp(entry["checked_at"]).isoformat() + "Z",
+    }
+
+
+def build_health(endpoints, cache) -> dict:
+    health = {url: health_entry(cache[url]) for url in sorted(endpoints) if url in cache}
+    return {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "ttl_seconds": TTL,
+        "summary": dict(Counter(h["status"] for h in health.values()).most_common()),
+        "endpoints": health,
+    }
+
+
+def load_health(path=HEALTH_FILE) -> dict:
+    """Endpoint URL -> health entry, or {} if nothing has been probed yet."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("endpoints", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def attach_health(connectors, health):
+    """Set "health" on each connector from `health` (see load_health); None if unprobed."""
+    for c in connectors:
+        url, _ = endpoint(c)
+        c["health"] = health.get(url) if probeable(url) else {"status": "user_configured"}
+        yield c
+
+
+# ---------------------------------------------------------------------------
+# Stand-in MCP servers
+# ---------------------------------------------------------------------------
+
+STUB_ROUTES = {
+    # path: (transport, behaviour)
+    "/ok/mcp": ("streamable-http", "ok"),
+    "/stream/mcp": ("streamable-http", "stream"),
+    "/auth/mcp": ("streamable-http", "auth"),
+    "/html/mcp": ("streamable-http", "html"),
+    "/fail/mcp": ("streamable-http", "fail"),
+    "/slow/mcp": ("streamable-http", "slow"),
+    "/ok/sse": ("sse", "ok"),
+    "/json/sse": ("sse", "html"),
+}
+
+
+def serve_stub(port, stub_input=None):
+    """Serve STUB_ROUTES; optionally write a connector file pointing at them."""
+    base = f"http://127.0.0.1:{port}"
+    if stub_input:
+        connectors = [{"uuid": f"stub-{i}", "name": path, "connection": {"url": base + path, "transport": transport}}
+                      for i, (path, (transport, _)) in enumerate(STUB_ROUTES.items())]
+        connectors.append({"uuid": "stub-refused", "name": "refused",
+                           "connection": {"url": "http://127.0.0.1:9/mcp", "transport": "streamable-http"}})
+        connectors.append({"uuid": "stub-template", "name": "template",
+                           "connection": {"url": "{url}", "transport": "streamable-http"}})
+        write_json(stub_input, {"total": len(connectors), "connectors": connectors}, indent=2)
+        print(f"Wrote {len(connectors)} stub connectors -> {stub_input}")
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = -1  # status, headers and body in one write, flushed per request
+
+        def behaviour(self):
+            return STUB_ROUTES.get(urlparse(self.path).path, (None, None))[1]
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            behaviour = self.behaviour()
+            result = json.dumps({"jsonrpc": "2.0", "id": 1, "result": {
+                "protocolVersion": PROTOCOL_VERSION, "capabilities": {"tools": {}},
+                "serverInfo": {"name": "stub", "version": "1.0"}}})
+            if behaviour == "ok":
+                self.reply(200, "application/json", result.encode("utf-8"), {"Mcp-Session-Id": "stub-session"})
+            elif behaviour == "stream":
+                self.reply(200, "text/event-stream", f"event: message\ndata: {result}\n\n".encode("utf-8"))
+            elif behaviour == "auth":
+                self.reply(401, "application/json", b'{"error": "invalid_token"}',
+                           {"WWW-Authenticate": 'Bearer resource_metadata="/.well-known/oauth-protected-resource"'})
+            elif behaviour == "html":
+                self.reply(200, "text/html", b"<html>Not an MCP server</html>")
+            elif behaviour == "fail":
+                self.reply(503, "text/plain", b"unavailable")
+            elif behaviour == "slow":
+                time.sleep(TIMEOUT * 2)
+                self.reply(200, "application/json", result.encode("utf-8"))
+            else:
+                self.reply(404, "text/plain", b"not found")
+
+        def do_GET(self):
+            behaviour = self.behaviour()
+            if behaviour == "ok" and self.path.endswith("/sse"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                self.wfile.write(b"event: endpoint\ndata: /messages?session=stub\n\n")
+                self.wfile.flush()
+                self.close_connection = True  # a real server would keep streaming
+            elif behaviour == "html":
+                self.reply(200, "application/json", b"{}")
+            else:
+                self.reply(405 if behaviour else 404, "text/plain", b"")
+
+        def do_DELETE(self):
+            self.reply(200 if self.behaviour() else 404, "text/plain", b"")
+
+        def reply(self, status, content_type, body, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            print(f"  {self.address_string()} {fmt % args}")
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    print(f"Stub MCP servers at {base}: {', '.join(STUB_ROUTES)} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe connector MCP endpoints and record their health")
+    parser.add_argument("--input", default=INPUT_FILE, help="Connector file (default: mcp_connectors.json)")
+    parser.add_argument("--health", default=HEALTH_FILE, help="Health artifact to write (default: mcp_health.json)")
+    parser.add_argument("--cache", default=CACHE_FILE, help="Probe cache (default: .health_cache.json)")
+    parser.add_argument("--force", action="store_true", help="Probe every endpoint, ignoring the TTL")
+    parser.add_argument("--ttl", type=int, default=TTL, help=f"Seconds a probe stays fresh (default: {TTL})")
+    parser.add_argument("--samples", type=int, default=SAMPLES,
+                        help=f"Probes per endpoint per run (default: {SAMPLES})")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help=f"Seconds per probe (default: {TIMEOUT})")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help=f"Probes in flight (default: {CONCURRENCY})")
+    parser.add_argument("--per-host", type=int, default=PER_HOST,
+                        help=f"Probes in flight per host (default: {PER_HOST})")
+    parser.add_argument("--serve-stub", type=int, metavar="PORT",
+                        help="Serve stand-in MCP servers for offline testing")
+    parser.add_argument("--stub-input", metavar="PATH",
+                        help="With --serve-stub: write a connector file pointing at the stub")
+    args = parser.parse_args()
+
+    if args.serve_stub:
+        serve_stub(args.serve_stub, args.stub_input)
+        return
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    connectors = document.get("connectors", [])
+    endpoints = {}
+    for c in connectors:
+        url, transport = endpoint(c)
+        if probeable(url):
+            endpoints[url] = transport
+    skipped = len(connectors) - sum(probeable(endpoint(c)[0]) for c in connectors)
+
+    cache = load_cache(args.cache)
+    print(f"{len(endpoints)} endpoints from {len(connectors)} connectors "
+          f"({skipped} without a fixed URL)...")
+    started = time.monotonic()
+    probed = asyncio.run(probe_all(endpoints, cache, ttl=args.ttl, force=args.force,
+                                   concurrency=max(1, args.concurrency), per_host=max(1, args.per_host),
+                                   timeout=args.timeout, samples=max(1, args.samples)))
+    elapsed = time.monotonic() - started
+    write_json(args.cache, cache, indent=2, sort_keys=True)
+
+    health = build_health(endpoints, cache)
+    write_json(args.health, health, indent=2)
+    document["connectors"] = list(attach_health(connectors, health["endpoints"]))
+    write_json(args.input, document, indent=2)
+
+    print(f"\n--- Health ({probed} probed in {elapsed:.1f}s, {len(endpoints) - probed} fresh in cache) ---")
+    for status, count in health["summary"].items():
+        print(f"  {status:<14} {count}")
+    latencies = [h["latency_ms"]["p50"] for h in health["endpoints"].values() if h["latency_ms"]]
+    if latencies:
+        print(f"  Median p50 latency: {percentile(latencies, 0.5):.0f} ms, "
+              f"slowest p50: {max(latencies):.0f} ms")
+    print(f"Wrote {args.health}; health attached to {len(connectors)} connectors in {args.input}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,21 +14,460 @@ Usage:
      (Log in manually in the browser window, then close it to save session)
   3. Scrape run: python3 scrap_connectors.py
   4. Resume:     python3 scrap_connectors.py  (skips already-scraped connectors)
+  5. Parallel:   python3 scrap_connectors.py --headless --concurrency 4
+  6. API mode:   python3 scrap_connectors.py --capture-api
+     (Records the registry JSON the page fetches into mcp-raw-captured.json;
+      only connectors missing from the capture are visited one by one)
+  7. Refresh:    python3 scrap_connectors.py --refresh
+     (Re-reads the listing; only new/changed connectors are visited, removed
+      ones are marked with removed_at. Fingerprints: mcp_connectors_fingerprints.json)
+  8. Sharded:    python3 scrap_connectors.py --headless --shards 4
+     (Exports the session to a private temp file, deleted afterwards, and runs 4 browser processes)
+  9. Record:     python3 scrap_connectors.py --fresh --record fixtures
+     (Saves listing/detail HTML + API responses for offline runs of bench_scraper.py)
+  10. Benchmark: python3 scrap_connectors.py --bench-extract 10
+     (Per-page latency of the single-evaluate extractor vs the locator path)
+  11. Daemon:    python3 scrap_connectors.py --daemon --headless   (leave running)
+                 python3 scrap_connectors.py --connect --fast --refresh
+     (Later runs attach over CDP instead of launching and logging in again)
+  12. Re-parse:  python3 scrap_connectors.py --save-bodies   (store detail text once)
+                 python3 scrap_connectors.py --reparse       (re-apply parser, no browser)
+  13. Network:   python3 scrap_connectors.py --net-compare 10
+     (Bytes on the wire with no filter, route blocking and cdp blocking)
 
 Output: mcp_connectors.json
 """
 
 import asyncio
 import argparse
+import hashlib
 import json
 import os
+import random
 import re
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import urlparse
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 
 USER_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "browser_data")
 OUTPUT_FILE = "mcp_connectors.json"
+# Registry JSON captured with --capture-api, in the raw format transform_mcp reads
+CAPTURE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp-raw-captured.json")
+REGISTRY_META_KEY = "com.anthropic.api/mcp-registry"
 INDEX_FILE = "mcp_connectors_index.json"  # Phase 1 output for resumption
+FINGERPRINT_FILE = "mcp_connectors_fingerprints.json"  # Per-card hashes for --refresh
+JOURNAL_FILE = "mcp_connectors.jsonl"  # Append-only progress log (--journal)
+JOURNAL_FSYNC_EVERY = 10  # fsync the journal after this many records
+BODY_DIR = "mcp_connectors_bodies"  # Detail text snapshots (--save-bodies / --reparse)
+SHARD_JOURNAL = "mcp_connectors.shard-{}.jsonl"  # Per-worker journal with --shards
+DAEMON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "browser_daemon.json")
+DAEMON_PORT = 9222  # CDP port of the --daemon browser
+REPORT_FILE = "mcp_connectors_report.json"  # Per-stage timings of the last run
+SHARD_REPORT = "mcp_connectors_report.shard-{}.json"  # Worker spans, merged into REPORT_FILE
+TRACE_FILE = "mcp_connectors_trace.zip"  # Playwright trace (--trace)
+# Request filter applied to every page in the context. Allow entries win over
+# deny entries; hosts match themselves and any subdomain.
+# mode "cdp" blocks by URL pattern with Network.setBlockedURLs, which keeps
+# the HTTP cache; "route" decides per request through context.route, which
+# handles any rule but turns the cache off (every page then re-downloads
+# the site's JS/CSS bundles). Rules cdp can't express fall back to route.
+RESOURCE_RULES = {
+    "mode": "cdp",
+    "allow_types": [],
+    "deny_types": ["image", "media", "font"],
+    "allow_hosts": [],
+    "deny_hosts": [
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+        "segment.io", "segment.com", "sentry.io", "intercom.io", "intercomcdn.com",
+        "statsig.com", "statsigapi.net", "hotjar.com", "fullstory.com",
+    ],
+}
+# URL suffixes standing in for resource types in the cdp filter mode
+TYPE_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "media": ["mp4", "webm", "mov", "mp3", "m4a", "ogg", "m3u8"],
+}
+MAX_ATTEMPTS = 3  # Per detail page, including the first try
+BACKOFF_BASE = 2.0  # Seconds before the first retry; doubles per attempt
+BACKOFF_MAX = 60.0
+RATE_LIMIT = 2.0  # Detail pages per second per host (token bucket refill rate)
+READY_TIMEOUT_MS = 10_000  # Upper bound for any single readiness wait
+QUIET_MS = 300  # DOM must be mutation-free this long to count as settled
+SCROLL_STEP_MS = 700  # Max wait for new cards after one scroll step
+
+
+# ---------------------------------------------------------------------------
+# Readiness: wait on page signals instead of fixed sleeps
+# ---------------------------------------------------------------------------
+
+# One entry per wait: {label, waited_ms, fixed_ms, timed_out}
+# fixed_ms is the hard-coded sleep the wait replaced, so the log shows
+# exactly how much time the signals saved.
+wait_log = []
+
+DOM_QUIET_JS = """([quietMs, timeoutMs]) => new Promise(resolve => {
+    let quiet, hard;
+    const done = (ok) => {
+        observer.disconnect();
+        clearTimeout(quiet);
+        clearTimeout(hard);
+        resolve(ok);
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(quiet);
+        quiet = setTimeout(() => done(true), quietMs);
+    });
+    observer.observe(document.body, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+    quiet = setTimeout(() => done(true), quietMs);
+    hard = setTimeout(() => done(false), timeoutMs);
+})"""
+
+
+def record_wait(label, started, fixed_ms, timed_out=False):
+    """Append a wait measurement to wait_log."""
+    wait_log.append({
+        "label": label,
+        "waited_ms": round((time.monotonic() - started) * 1000),
+        "fixed_ms": fixed_ms,
+        "timed_out": timed_out,
+    })
+
+
+async def wait_for_dom_quiet(page, label, fixed_ms, quiet_ms=QUIET_MS, timeout=READY_TIMEOUT_MS) -> bool:
+    """Wait until the DOM has stopped mutating for quiet_ms. False on timeout."""
+    started = time.monotonic()
+    try:
+        settled = await page.evaluate(DOM_QUIET_JS, [quiet_ms, timeout])
+    except Exception:
+        settled = False
+    record_wait(label, started, fixed_ms, timed_out=not settled)
+    return settled
+
+
+async def wait_for_card_growth(page, prev_count, label, fixed_ms, timeout=READY_TIMEOUT_MS) -> int:
+    """Wait for more directory links than prev_count. Returns the new count."""
+    started = time.monotonic()
+    timed_out = False
+    try:
+        await page.wait_for_function(
+            "n => document.querySelectorAll(\"a[href*='/directory/']\").length > n",
+            arg=prev_count,
+            timeout=timeout,
+        )
+    except PlaywrightTimeout:
+        timed_out = True
+    record_wait(label, started, fixed_ms, timed_out=timed_out)
+    return await page.locator("a[href*='/directory/']").count()
+
+
+async def wait_for_text(page, text, label, fixed_ms, timeout=READY_TIMEOUT_MS) -> bool:
+    """Wait for visible text to appear on the page. False on timeout."""
+    started = time.monotonic()
+    try:
+        await page.wait_for_selector(f"text={text}", timeout=timeout)
+        found = True
+    except PlaywrightTimeout:
+        found = False
+    record_wait(label, started, fixed_ms, timed_out=not found)
+    return found
+
+
+def wait_summary() -> dict:
+    """Aggregate wait_log per label: count, waited vs fixed ms, timeouts."""
+    summary = {}
+    for w in wait_log:
+        s = summary.setdefault(w["label"], {"count": 0, "waited_ms": 0, "fixed_ms": 0, "timeouts": 0})
+        s["count"] += 1
+        s["waited_ms"] += w["waited_ms"]
+        s["fixed_ms"] += w["fixed_ms"]
+        s["timeouts"] += int(w["timed_out"])
+    return summary
+
+
+def print_wait_summary():
+    """Print how long readiness waits took compared to the old fixed sleeps."""
+    summary = wait_summary()
+    if not summary:
+        return
+    print("\n--- Readiness waits ---")
+    for label, s in summary.items():
+        print(f"  {label:<20} {s['count']:>4}x  {s['waited_ms'] / 1000:>7.1f}s "
+              f"(fixed: {s['fixed_ms'] / 1000:.1f}s, timeouts: {s['timeouts']})")
+    waited = sum(s["waited_ms"] for s in summary.values())
+    fixed = sum(s["fixed_ms"] for s in summary.values())
+    print(f"  Total waited {waited / 1000:.1f}s vs {fixed / 1000:.1f}s fixed "
+          f"(saved {(fixed - waited) / 1000:.1f}s)")
+
+
+# ---------------------------------------------------------------------------
+# Network: resource filter + request/byte counters
+# ---------------------------------------------------------------------------
+
+net_stats = {"requests": 0, "cached": 0, "blocked": 0, "bytes": 0, "by_type": {}}
+
+
+def reset_net_stats():
+    net_stats.update(requests=0, cached=0, blocked=0, bytes=0, by_type={})
+
+
+def host_matches(host, hosts) -> bool:
+    """True if host equals, or is a subdomain of, any entry in hosts."""
+    return any(host == h or host.endswith("." + h) for h in hosts)
+
+
+def should_block(resource_type, url, rules=RESOURCE_RULES) -> bool:
+    """Decide whether a request is dropped by the resource filter."""
+    host = urlparse(url).hostname or ""
+    if host_matches(host, rules["allow_hosts"]):
+        return False
+    if host_matches(host, rules["deny_hosts"]):
+        return True
+    if resource_type in rules["allow_types"]:
+        return False
+    if resource_type in rules["deny_types"]:
+        return True
+    # A non-empty allow_types list acts as a whitelist
+    return bool(rules["allow_types"]) and resource_type != "document"
+
+
+def blocked_url_patterns(rules):
+    """
+    `rules` as Network.setBlockedURLs patterns, or None if they need a
+    per-request decision (allow lists, or a deny type without known URL
+    suffixes) and so only work in route mode.
+    """
+    if rules["allow_types"] or rules["allow_hosts"]:
+        return None
+    patterns = []
+    for rtype in rules["deny_types"]:
+        if rtype not in TYPE_EXTENSIONS:
+            return None
+        for ext in TYPE_EXTENSIONS[rtype]:
+            patterns += [f"*.{ext}", f"*.{ext}?*"]
+    for host in rules["deny_hosts"]:
+        patterns += [f"*://{host}/*", f"*://*.{host}/*"]
+    return patterns
+
+
+async def install_network_filter(context, rules=RESOURCE_RULES, budget_mb=None) -> str:
+    """
+    Apply `rules` to every page of the context (None: block nothing) and
+    count requests, cache hits and bytes on the wire in net_stats. Bytes
+    come from CDP (encodedDataLength), so cache hits cost nothing and the
+    modes are measured the same way. Logo URLs are still read from
+    <img src>, so blocking images loses no data. Returns the mode used.
+    """
+    budget = budget_mb * 1024 * 1024 if budget_mb else None
+    warned = False
+    patterns = blocked_url_patterns(rules) if rules and rules.get("mode", "cdp") == "cdp" else None
+    mode = "off" if rules is None else "cdp" if patterns is not None else "route"
+
+    def on_finished(types, event):
+        nonlocal warned
+        size = max(int(event.get("encodedDataLength", 0)), 0)
+        rtype = types.pop(event["requestId"], "other")
+        net_stats["requests"] += 1
+        net_stats["bytes"] += size
+        t = net_stats["by_type"].setdefault(rtype, {"requests": 0, "bytes": 0})
+        t["requests"] += 1
+        t["bytes"] += size
+        if budget and not warned and net_stats["bytes"] > budget:
+            warned = True
+            print(f"  WARNING: bandwidth budget of {budget_mb} MB exceeded")
+
+    def on_cached():
+        net_stats["cached"] += 1
+
+    def on_failed(types, event):
+        types.pop(event["requestId"], None)
+        if event.get("blockedReason"):  # blocked by setBlockedURLs
+            net_stats["blocked"] += 1
+
+    async def watch(page):
+        types = {}  # requestId -> resource type, until the request finishes
+        try:
+            cdp = await context.new_cdp_session(page)
+            cdp.on("Network.requestWillBeSent",
+                   lambda e: types.__setitem__(e["requestId"], e.get("type", "other").lower()))
+            cdp.on("Network.requestServedFromCache", lambda e: on_cached())
+            cdp.on("Network.loadingFinished", lambda e: on_finished(types, e))
+            cdp.on("Network.loadingFailed", lambda e: on_failed(types, e))
+            await cdp.send("Network.enable")
+            if patterns:
+                await cdp.send("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            print(f"  Network counters unavailable for a page: {e}")
+
+    async def on_route(route):
+        request = route.request
+        if should_block(request.resource_type, request.url, rules):
+            net_stats["blocked"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    if mode == "route":
+        if rules.get("mode", "cdp") == "cdp":
+            print("  Filter rules need per-request decisions: using route mode (HTTP cache off)")
+        await context.route("**/*", on_route)
+    for page in context.pages:
+        if page not in attached_pages.get(context, ()):  # a daemon's other tabs
+            await watch(page)
+    # new_page() awaits the watcher, so no request slips past the block list
+    context.on("page", lambda page: page_watchers.__setitem__(page, asyncio.ensure_future(watch(page))))
+    return mode
+
+
+page_watchers = {}  # page -> pending install_network_filter setup
+
+
+async def new_page(context):
+    """context.new_page(), returned once the network filter is active on it."""
+    page = await context.new_page()
+    watcher = page_watchers.pop(page, None)
+    if watcher:
+        await watcher
+    return page
+
+
+def split_csv(value) -> list:
+    """Parse a comma-separated CLI value into a list of stripped items."""
+    return [x.strip() for x in value.split(",") if x.strip()]
+
+
+def print_net_summary():
+    """Print request/byte totals for the run."""
+    if not net_stats["requests"] and not net_stats["blocked"]:
+        return
+    print("\n--- Network ---")
+    print(f"  Requests: {net_stats['requests']}  from cache: {net_stats['cached']}  "
+          f"blocked: {net_stats['blocked']}  transferred: {net_stats['bytes'] / 1024 / 1024:.1f} MB")
+    for rtype, t in sorted(net_stats["by_type"].items(), key=lambda kv: -kv[1]["bytes"]):
+        print(f"  {rtype:<12} {t['requests']:>6}  {t['bytes'] / 1024:>10.0f} KB")
+
+
+# ---------------------------------------------------------------------------
+# Instrumentation: stage spans + run report
+# ---------------------------------------------------------------------------
+
+# One entry per timed span: {stage, ms, ...attrs}
+run_spans = []
+
+
+def record_span(stage, ms, **attrs):
+    """Append a finished span to run_spans."""
+    run_spans.append({"stage": stage, "ms": round(ms, 1), **attrs})
+
+
+@contextmanager
+def span(stage, **attrs):
+    """Time the enclosed block (sync or awaited code) as `stage`."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        record_span(stage, (time.monotonic() - started) * 1000, **attrs)
+
+
+def percentile(values, pct) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def stage_stats(spans) -> dict:
+    """Per-stage count, total, p50, p95 and max in ms."""
+    by_stage = {}
+    for sp in spans:
+        by_stage.setdefault(sp["stage"], []).append(sp["ms"])
+    return {
+        stage: {
+            "count": len(values),
+            "total_ms": round(sum(values), 1),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "max_ms": round(max(values), 1),
+        }
+        for stage, values in by_stage.items()
+    }
+
+
+def write_run_report(started, **extra):
+    """
+    Write REPORT_FILE next to OUTPUT_FILE: per-stage timing percentiles,
+    readiness waits vs fixed sleeps, network counters and the slowest
+    connectors.
+    """
+    connectors = sorted((sp for sp in run_spans if sp["stage"] == "connector"),
+                        key=lambda sp: -sp["ms"])
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "wall_s": round(time.monotonic() - started, 1),
+        **extra,
+        "stages": stage_stats(run_spans),
+        "waits": wait_summary(),
+        "network": net_stats,
+        "slowest_connectors": connectors[:10],
+    }
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def write_shard_report(index):
+    """Worker side of --shards: dump this process's spans, waits and counters."""
+    with open(SHARD_REPORT.format(index), "w", encoding="utf-8") as f:
+        json.dump({"spans": run_spans, "waits": wait_log, "network": net_stats}, f)
+
+
+def shard_reports() -> list:
+    """Paths of per-worker reports left in the working directory."""
+    prefix, suffix = SHARD_REPORT.split("{}")
+    return sorted(f for f in os.listdir(".") if f.startswith(prefix) and f.endswith(suffix))
+
+
+def merge_shard_reports() -> int:
+    """
+    Fold every worker's SHARD_REPORT into run_spans, wait_log and net_stats
+    and delete the files. Returns the number of reports merged.
+    """
+    paths = shard_reports()
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                shard = json.load(f)
+        except (OSError, ValueError):
+            continue
+        finally:
+            os.remove(path)
+        run_spans.extend(shard["spans"])
+        wait_log.extend(shard["waits"])
+        for key in ("requests", "cached", "blocked", "bytes"):
+            net_stats[key] += shard["network"].get(key, 0)
+        for rtype, t in shard["network"]["by_type"].items():
+            mine = net_stats["by_type"].setdefault(rtype, {"requests": 0, "bytes": 0})
+            mine["requests"] += t["requests"]
+            mine["bytes"] += t["bytes"]
+    return len(paths)
+
+
+def print_stage_summary():
+    """Print per-stage p50/p95 timings."""
+    stats = stage_stats(run_spans)
+    if not stats:
+        return
+    print("\n--- Stages ---")
+    for stage, st in stats.items():
+        print(f"  {stage:<16} {st['count']:>5}x  total {st['total_ms'] / 1000:>7.1f}s  "
+              f"p50 {st['p50_ms']:>7.0f} ms  p95 {st['p95_ms']:>7.0f} ms")
 
 
 # ---------------------------------------------------------------------------
@@ -65,29 +504,138 @@ async def click_web_tab(page):
     """Click the 'Web' tab on the directory page."""
     tab = page.locator("button, a, [role='tab']").filter(has_text="Web")
     await tab.first.click()
-    await page.wait_for_timeout(2000)
+    await wait_for_dom_quiet(page, "web tab", fixed_ms=2000)
+
+
+# Scroll one step; true if the viewport now reaches the end of the document
+SCROLL_STEP_JS = """() => {
+    window.scrollBy(0, 600);
+    window.__scrollHeight = document.documentElement.scrollHeight;
+    return window.scrollY + window.innerHeight >= window.__scrollHeight - 1;
+}"""
+SCROLL_GREW_JS = "() => document.documentElement.scrollHeight > window.__scrollHeight"
 
 
 async def scroll_to_load_all(page) -> int:
     """Scroll down until all connector cards are loaded. Returns card count."""
-    prev_count = 0
+    prev_count = await page.locator("a[href*='/directory/']").count()
     stable = 0
     for _ in range(60):
-        await page.evaluate("window.scrollBy(0, 600)")
-        await page.wait_for_timeout(700)
-        curr = await page.locator("a[href*='/directory/']").count()
+        at_bottom = await page.evaluate(SCROLL_STEP_JS)
+        # Returns as soon as new cards render; a stalled step waits no
+        # longer than the sleep it replaced
+        curr = await wait_for_card_growth(page, prev_count, "scroll step", fixed_ms=700, timeout=SCROLL_STEP_MS)
         if curr == prev_count:
+            # Nothing below left to trigger a load: the list is complete
+            if at_bottom and not await page.evaluate(SCROLL_GREW_JS):
+                break
             stable += 1
-            if stable >= 4:
+            if stable >= 3:
                 break
         else:
             stable = 0
         prev_count = curr
     await page.evaluate("window.scrollTo(0, 0)")
-    await page.wait_for_timeout(1000)
+    await wait_for_dom_quiet(page, "scroll to top", fixed_ms=1000)
     return prev_count
 
 
+# In-page card collector: a MutationObserver records every directory card as
+# it renders into window.__cardHarvest.buffer, so cards survive even if a
+# virtualized list later removes them from the DOM.
+HARVEST_INSTALL_JS = r"""() => {
+    if (window.__cardHarvest) return window.__cardHarvest.seen.size;
+    const seen = new Set();
+    const buffer = [];
+    const SELECTOR = 'a[href*="/directory/"]';
+
+    const add = (link) => {
+        const href = link.getAttribute('href');
+        if (!href || seen.has(href)) return;
+        if (!/\/directory\/[0-9a-f-]{20,}/.test(href)) return;
+        const lines = (link.innerText || '').split('\n')
+            .map(l => l.trim())
+            .filter(l => l && l !== '+' && l !== 'Connect');
+        // Not rendered yet: a later mutation inside the link retries it
+        if (lines.length === 0) return;
+        seen.add(href);
+        const img = link.querySelector('img');
+        buffer.push({
+            name: lines[0],
+            tagline: lines.length > 1 ? lines[1] : '',
+            logo_url: img ? (img.src || '') : '',
+            detail_url: href.startsWith('http') ? href : 'https://claude.ai' + href,
+        });
+    };
+
+    const scan = (node) => {
+        const el = node.nodeType === 1 ? node : node.parentElement;
+        if (!el) return;
+        const owner = el.closest(SELECTOR);
+        if (owner) add(owner);
+        for (const link of el.querySelectorAll(SELECTOR)) add(link);
+    };
+
+    new MutationObserver(mutations => {
+        for (const m of mutations) {
+            if (m.type === 'characterData') scan(m.target);
+            for (const n of m.addedNodes) scan(n);
+        }
+    }).observe(document.body, {childList: true, subtree: true, characterData: true});
+
+    scan(document.body);
+    window.__cardHarvest = {seen, buffer};
+    return seen.size;
+}"""
+
+# Drain the buffer and scroll on in the same round-trip
+HARVEST_DRAIN_JS = """() => {
+    const batch = window.__cardHarvest.buffer.splice(0);
+    window.scrollBy(0, 600);
+    return batch;
+}"""
+
+
+async def harvest_cards(page, max_steps=2000, idle_steps=3) -> list:
+    """
+    Scroll the listing while the in-page collector accumulates cards, and
+    drain them in batches. Stops once `idle_steps` scrolls in a row bring
+    no new uuids. Returns cards in the order they first rendered.
+    """
+    await page.evaluate(HARVEST_INSTALL_JS)
+    cards = []
+    seen = set()
+    idle = 0
+    for step in range(max_steps):
+        if step:
+            started = time.monotonic()
+            try:
+                await page.wait_for_function(
+                    "() => window.__cardHarvest.buffer.length > 0", timeout=1000)
+                timed_out = False
+            except PlaywrightTimeout:
+                timed_out = True
+            record_wait("harvest step", started, fixed_ms=700, timed_out=timed_out)
+
+        batch = await page.evaluate(HARVEST_DRAIN_JS)
+        fresh = [c for c in batch if card_uuid(c) not in seen]
+        for c in fresh:
+            seen.add(card_uuid(c))
+            cards.append(c)
+
+        if fresh:
+            idle = 0
+            if len(cards) // 100 != (len(cards) - len(fresh)) // 100:
+                print(f"  ...{len(cards)} cards")
+        else:
+            idle += 1
+            if idle >= idle_steps:
+                break
+
+    await page.evaluate("window.scrollTo(0, 0)")
+    return cards
+
+
 async def collect_cards_from_listing(page) -> list:
     """
     Extract card metadata + detail URLs from the listing page.
@@ -134,78 +682,327 @@ async def collect_cards_from_listing(page) -> list:
     return await collect_cards_by_clicking(page)
 
 
-async def collect_cards_by_clicking(page) -> list:
-    """Fallback: click each card, record the URL it navigates to, go back."""
-    cards = []
-    add_btns = page.locator("button").filter(has_text="+")
-    total = await add_btns.count()
+# For every "+" card button: the card name, plus a detail URL recovered from
+# the React props/fiber of the card (no click needed) when one is present.
+CARD_ROUTE_HINTS_JS = r"""() => {
+    const UUID = /[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}/;
+    const ID_KEYS = new Set(['href', 'url', 'uuid', 'id', 'serverId', 'connectorId', 'directoryUrl']);
 
-    for i in range(total):
-        try:
-            btn = add_btns.nth(i)
-            await btn.scroll_into_view_if_needed()
-            await page.wait_for_timeout(200)
-
-            # Get card name via JS
-            name = await btn.evaluate("""(el) => {
-                let p = el;
-                for (let i = 0; i < 5; i++) {
-                    if (p.parentElement) p = p.parentElement;
-                    else break;
+    const fromValue = (key, value) => {
+        if (typeof value !== 'string') return '';
+        const m = value.match(/\/directory\/([0-9a-f-]{20,})/);
+        if (m) return m[1];
+        if (ID_KEYS.has(key)) {
+            const u = value.match(UUID);
+            if (u) return u[0];
+        }
+        return '';
+    };
+
+    const fromProps = (props) => {
+        if (!props || typeof props !== 'object') return '';
+        for (const [key, value] of Object.entries(props)) {
+            let found = fromValue(key, value);
+            if (found) return found;
+            if (value && typeof value === 'object' && !Array.isArray(value) && key !== 'children') {
+                for (const [k2, v2] of Object.entries(value)) {
+                    found = fromValue(k2, v2);
+                    if (found) return found;
                 }
-                const lines = (p.innerText || '').split('\\n')
-                    .map(l => l.trim())
-                    .filter(l => l && l !== '+' && l !== 'Connect');
-                return lines[0] || '';
-            }""")
+            }
+        }
+        return '';
+    };
+
+    const uuidFor = (el) => {
+        for (let node = el; node && node !== document.body; node = node.parentElement) {
+            const propsKey = Object.keys(node).find(k => k.startsWith('__reactProps$'));
+            const found = propsKey && fromProps(node[propsKey]);
+            if (found) return found;
+            const fiberKey = Object.keys(node).find(k => k.startsWith('__reactFiber$'));
+            let fiber = fiberKey ? node[fiberKey] : null;
+            for (let i = 0; fiber && i < 15; i++, fiber = fiber.return) {
+                const f = fromProps(fiber.memoizedProps);
+                if (f) return f;
+            }
+        }
+        return '';
+    };
+
+    const buttons = [...document.querySelectorAll('button')]
+        .filter(b => (b.innerText || '').includes('+'));
+    return buttons.map(btn => {
+        let card = btn;
+        for (let i = 0; i < 5 && card.parentElement; i++) card = card.parentElement;
+        const lines = (card.innerText || '').split('\n')
+            .map(l => l.trim())
+            .filter(l => l && l !== '+' && l !== 'Connect');
+        const uuid = uuidFor(btn);
+        return {
+            name: lines[0] || '',
+            tagline: lines.length > 1 ? lines[1] : '',
+            detail_url: uuid ? 'https://claude.ai/directory/' + uuid : '',
+        };
+    });
+}"""
+
+DETAIL_URL_RE = re.compile(r"/directory/[0-9a-f-]{20,}")
+
+# Record client-side route changes without blocking them
+HISTORY_HOOK_JS = """() => {
+    window.__navLog = [];
+    if (window.__navHooked) return;
+    window.__navHooked = true;
+    for (const fn of ['pushState', 'replaceState']) {
+        const orig = history[fn].bind(history);
+        history[fn] = (state, title, url) => {
+            if (url) window.__navLog.push(new URL(String(url), location.href).href);
+            return orig(state, title, url);
+        };
+    }
+}"""
 
-            if not name:
-                continue
+
+async def collect_cards_by_clicking(page) -> list:
+    """
+    Fallback when cards have no <a href>.
+
+    First tries to read each card's uuid from its React props in a single
+    evaluate. Cards that still have no URL are clicked one at a time; the
+    client-side route change is caught by a history.pushState hook (or, if
+    the click did a full navigation, read from page.url) and the listing is
+    restored with an in-page history.back() plus a click on the Web tab, so
+    no page.goto happens per card.
+    """
+    hints = await page.evaluate(CARD_ROUTE_HINTS_JS)
+    cards = [{"name": h["name"], "tagline": h["tagline"], "logo_url": "", "detail_url": h["detail_url"]}
+             for h in hints if h["name"]]
+    missing = [c for c in cards if not c["detail_url"]]
+    print(f"  Resolved {len(cards) - len(missing)}/{len(cards)} card URLs from React props")
+
+    listing_url = page.url
+    for card in missing:
+        try:
+            await page.evaluate(HISTORY_HOOK_JS)
 
             # Click the card name text (not the + button) to open detail
-            name_el = page.get_by_text(name, exact=True).first
+            name_el = page.get_by_text(card["name"], exact=True).first
+            await name_el.scroll_into_view_if_needed()
             await name_el.click(timeout=5000)
-            await page.wait_for_timeout(2000)
-
-            detail_url = page.url
-            if "/directory/" in detail_url and detail_url != "https://claude.ai/directory":
-                cards.append({
-                    "name": name,
-                    "tagline": "",
-                    "logo_url": "",
-                    "detail_url": detail_url,
-                })
-
-            # Go back
-            await page.go_back()
-            await page.wait_for_timeout(2000)
-
-            # Re-select Web tab
+
+            started = time.monotonic()
             try:
-                await click_web_tab(page)
+                handle = await page.wait_for_function(
+                    "() => window.__navLog.find(u => /\\/directory\\/[0-9a-f-]{20,}/.test(u))",
+                    timeout=5000,
+                )
+                card["detail_url"] = await handle.json_value()
             except Exception:
-                pass
+                # A full navigation replaced the document and the hook with
+                # it; the detail URL is then the page's own
+                try:
+                    await page.wait_for_url(DETAIL_URL_RE, timeout=5000)
+                    card["detail_url"] = page.url
+                except PlaywrightTimeout:
+                    pass
+            record_wait("fallback route", started, fixed_ms=2000, timed_out=not card["detail_url"])
+
+            if page.url != listing_url:
+                started = time.monotonic()
+                await page.evaluate("history.back()")
+                await page.wait_for_url(listing_url, timeout=5000)
+                record_wait("fallback back", started, fixed_ms=4000)
+                # The listing comes back on its default tab
+                await click_web_tab(page)
 
         except Exception as e:
-            print(f"  Fallback click failed for card {i}: {e}")
+            print(f"  Fallback click failed for {card['name']}: {e}")
             try:
-                await page.goto("https://claude.ai/directory", wait_until="networkidle")
-                await page.wait_for_timeout(2000)
+                await page.goto(listing_url, wait_until="networkidle")
+                await wait_for_text(page, "Web", "directory load", fixed_ms=2000)
                 await click_web_tab(page)
-                await page.wait_for_timeout(2000)
             except Exception:
                 pass
 
-    return cards
+    return [c for c in cards if c["detail_url"]]
+
+
+# ---------------------------------------------------------------------------
+# Detail body parser (pure, no browser)
+# ---------------------------------------------------------------------------
+
+TOOL_NAME_RE = re.compile(r"[A-Za-z][A-Za-z0-9_.\-:]*")
+VERSION_VALUE_RE = re.compile(r"[\d.]+")
+URL_VALUE_RE = re.compile(r"https?://\S+")
+TOOLS_SKIP = frozenset({
+    "Tools", "Details", "Version", "Author", "Back", "Connect",
+    "Developed by", "More info", "Connector URL",
+})
+# Labels whose value is the next non-blank line: label -> (key, value pattern)
+VALUE_LABELS = {
+    "Version": ("version", VERSION_VALUE_RE),
+    "Connector URL": ("connector_url", URL_VALUE_RE),
+    "Author": ("author", None),
+}
+
+
+def _text_between(lines, start, end) -> str:
+    """Text from (line, col) `start` up to (line, col) `end` in `lines`."""
+    (i1, c1), (i2, c2) = start, end
+    if (i1, c1) >= (i2, c2):
+        return ""
+    if i1 == i2:
+        return lines[i1][c1:c2]
+    return "\n".join([lines[i1][c1:]] + lines[i1 + 1:i2] + [lines[i2][:c2]])
+
+
+def parse_detail_body(body, name="") -> dict:
+    """
+    Parse the visible text of a detail page into tagline, description,
+    developer/author names, tools, version and connector_url.
+
+    The body is tokenized in one pass over its lines: the pass records
+    where the name, "Developed by", "Tools" and "Details" markers sit and
+    resolves each "label / next non-blank line" value as it goes. Link
+    URLs are not part of the text and are left for the caller.
+    """
+    lines = body.split("\n")
+    last = len(lines) - 1
+    name_at = dev_at = None
+    tools_at = tools_fallback = details_at = details_fallback = None
+    pending = []  # Keys waiting for the next non-blank line
+    detail = {}
+
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+
+        if stripped and pending:
+            for key in pending:
+                if key == "developer":
+                    detail["developer"] = {"name": stripped, "url": ""}
+                elif key == "author":
+                    detail.setdefault("author", {"name": stripped, "url": ""})
+                else:
+                    pattern = VALUE_LABELS["Version" if key == "version" else "Connector URL"][1]
+                    m = pattern.match(stripped)
+                    if m and key not in detail:
+                        detail[key] = m.group(0)
+            pending = []
+
+        if name and name_at is None:
+            col = line.find(name)
+            if col >= 0:
+                name_at = (i, col)
+
+        if dev_at is None:
+            col = line.find("Developed by")
+            if col >= 0:
+                dev_at = (i, col)
+                rest = line[col + len("Developed by"):].strip()
+                if rest:
+                    detail["developer"] = {"name": rest, "url": ""}
+                else:
+                    pending.append("developer")
+
+        if i > 0 and tools_at is None and line.startswith("Tools"):
+            tools_at = (i, 0)
+        if tools_fallback is None and i < last and line.endswith("Tools"):
+            tools_fallback = (i, len(line) - len("Tools"))
+        if i > 0 and details_at is None and line.startswith("Details"):
+            details_at = (i, 0)
+        if details_fallback is None and i < last and line.endswith("Details"):
+            details_fallback = (i, len(line) - len("Details"))
+
+        rstripped = line.rstrip()
+        if i < last:
+            for label, (key, _) in VALUE_LABELS.items():
+                if rstripped.endswith(label) and key not in detail and key not in pending:
+                    pending.append(key)
+
+    # === Tagline & Description ===
+    # Between name and "Developed by": tagline (short) then description (longer)
+    if name_at is not None and dev_at is not None and dev_at != (0, 0):
+        between = _text_between(lines, (name_at[0], name_at[1] + len(name)), dev_at)
+        texts = [
+            l.strip() for l in between.split("\n")
+            if l.strip()
+            and l.strip() != "Connect"
+            and not l.strip().startswith("Only use connectors")
+            and len(l.strip()) > 5
+        ]
+        if len(texts) >= 2:
+            detail["tagline"] = texts[0]
+            detail["description"] = texts[1]
+        elif len(texts) == 1:
+            if len(texts[0]) < 80:
+                detail["tagline"] = texts[0]
+            else:
+                detail["description"] = texts[0]
+
+    # === Tools ===
+    tools_at = tools_at or tools_fallback
+    details_at = details_at or details_fallback
+    if tools_at is not None and details_at is not None and details_at > tools_at:
+        detail["tools"] = [
+            t for t in (l.strip() for l in _text_between(lines, tools_at, details_at).split("\n"))
+            if t and t not in TOOLS_SKIP and not t.isdigit() and TOOL_NAME_RE.fullmatch(t)
+        ]
+
+    return detail
 
 
 # ---------------------------------------------------------------------------
 # Phase 2: Detail scraping
 # ---------------------------------------------------------------------------
 
-async def scrape_detail(page) -> dict:
+# Everything parse_snapshot() needs: heading name, visible text and links
+DETAIL_SNAPSHOT_JS = """() => {
+    const labels = new Set(['Details', 'Tools', 'Back', 'More info', '']);
+    const heading = [...document.querySelectorAll('h1, h2')]
+        .map(h => (h.textContent || '').trim())
+        .find(t => t && !labels.has(t));
+    return {
+        name: heading || '',
+        body: document.body.innerText || '',
+        links: [...document.querySelectorAll('a')].map(a => ({
+            text: (a.textContent || '').trim(),
+            href: a.getAttribute('href') || '',
+        })),
+    };
+}"""
+
+
+def parse_snapshot(snap) -> dict:
+    """
+    Parse a DETAIL_SNAPSHOT_JS result, live or stored, into detail fields.
+    All parsing rules live here and in parse_detail_body.
+    """
+    detail = {"name": snap["name"]} if snap.get("name") else {}
+    detail.update(parse_detail_body(snap.get("body", ""), detail.get("name", "")))
+
+    links = snap.get("links", [])
+    for key in ("developer", "author"):
+        if key in detail:
+            detail[key]["url"] = next(
+                (l["href"] for l in links
+                 if l["text"] == detail[key]["name"] and l["href"].startswith("http")
+                 and "claude.ai" not in l["href"]), "")
+
+    more_info = {}
+    for label in ["Documentation", "Support", "Privacy Policy"]:
+        link = next((l for l in links if label.lower() in l["text"].lower()), None)
+        if link and link["href"].startswith("http"):
+            more_info[label.lower().replace(" ", "_")] = link["href"]
+    if more_info:
+        detail["more_info"] = more_info
+    return detail
+
+
+async def scrape_detail(page, extractor="snapshot"):
     """
     Extract connector details from a detail page (visited directly by URL).
+    Returns (detail, snapshot); snapshot is the DETAIL_SNAPSHOT_JS result
+    the detail was parsed from (None on the locator path).
 
     Page structure (top to bottom):
       Back / X buttons
@@ -222,15 +1019,53 @@ async def scrape_detail(page) -> dict:
       1.0.0            AuthorName (link)
       Connector URL    More info
       https://...      Documentation / Support / Privacy Policy (links)
+
+    extractor="snapshot" reads the heading, text and links in one
+    page.evaluate round-trip and parses them in Python (parse_snapshot, the
+    same code --reparse uses), falling back to the locator path if that
+    yields nothing; extractor="dom" always uses the locator path.
     """
-    detail = {}
+    if not await wait_for_text(page, "Developed by", "developed by", fixed_ms=2000):
+        return {}, None
+
+    # The Details block (version, author, links) renders after the header
+    await wait_for_text(page, "Details", "details section", fixed_ms=0, timeout=3000)
+    await wait_for_dom_quiet(page, "detail settle", fixed_ms=1200)
 
+    with span("extract"):
+        if extractor == "snapshot":
+            detail, snap = await extract_detail_snapshot(page)
+            if detail.get("name"):
+                return detail, snap
+        return await extract_detail_dom(page), None
+
+
+async def extract_detail_snapshot(page):
+    """Single round-trip extraction: (detail, snapshot), or ({}, None) on failure."""
     try:
-        await page.wait_for_selector("text=Developed by", timeout=10000)
-    except PlaywrightTimeout:
-        return detail
+        snap = await page.evaluate(DETAIL_SNAPSHOT_JS)
+    except Exception:
+        return {}, None
+    return parse_snapshot(snap), snap
+
+
+async def find_external_link(page, text) -> str:
+    """href of the first non-claude.ai http link whose text is exactly `text`."""
+    try:
+        all_links = page.locator("a[href^='http']")
+        for i in range(await all_links.count()):
+            if (await all_links.nth(i).text_content()).strip() == text:
+                href = await all_links.nth(i).get_attribute("href")
+                if href and "claude.ai" not in href:
+                    return href
+    except Exception:
+        pass
+    return ""
+
 
-    await page.wait_for_timeout(1200)
+async def extract_detail_dom(page) -> dict:
+    """Locator + regex extraction (one IPC call per lookup). Fallback path."""
+    detail = {}
 
     # Get visible text for structured parsing
     body = await page.inner_text("body")
@@ -246,116 +1081,13 @@ async def scrape_detail(page) -> dict:
     except Exception:
         pass
 
-    # === Tagline & Description ===
-    # Between name and "Developed by": tagline (short) then description (longer)
-    try:
-        name = detail.get("name", "")
-        dev_idx = body.find("Developed by")
-        if name and dev_idx > 0:
-            name_idx = body.find(name)
-            if name_idx >= 0:
-                between = body[name_idx + len(name):dev_idx]
-                lines = [
-                    l.strip() for l in between.split("\n")
-                    if l.strip()
-                    and l.strip() != "Connect"
-                    and not l.strip().startswith("Only use connectors")
-                    and len(l.strip()) > 5
-                ]
-                if len(lines) >= 2:
-                    detail["tagline"] = lines[0]
-                    detail["description"] = lines[1]
-                elif len(lines) == 1:
-                    if len(lines[0]) < 80:
-                        detail["tagline"] = lines[0]
-                    else:
-                        detail["description"] = lines[0]
-    except Exception:
-        pass
-
-    # === Developer ===
-    try:
-        match = re.search(r"Developed by\s*\n?\s*(.+?)(?:\n|$)", body)
-        if match:
-            dev_name = match.group(1).strip()
-            dev_url = ""
-            try:
-                all_links = page.locator("a[href^='http']")
-                for i in range(await all_links.count()):
-                    text = (await all_links.nth(i).text_content()).strip()
-                    if text == dev_name:
-                        href = await all_links.nth(i).get_attribute("href")
-                        if href and "claude.ai" not in href:
-                            dev_url = href
-                            break
-            except Exception:
-                pass
-            detail["developer"] = {"name": dev_name, "url": dev_url}
-    except Exception:
-        pass
+    # === Text fields ===
+    detail.update(parse_detail_body(body, detail.get("name", "")))
 
-    # === Tools ===
-    try:
-        tools_start = body.find("\nTools")
-        if tools_start < 0:
-            tools_start = body.find("Tools\n")
-        details_start = body.find("\nDetails")
-        if details_start < 0:
-            details_start = body.find("Details\n")
-
-        if tools_start >= 0 and details_start > tools_start:
-            tools_text = body[tools_start:details_start]
-            lines = [l.strip() for l in tools_text.split("\n") if l.strip()]
-            tools = []
-            skip = {
-                "Tools", "Details", "Version", "Author", "Back", "Connect",
-                "Developed by", "More info", "Connector URL",
-            }
-            for line in lines:
-                if line in skip or line.isdigit():
-                    continue
-                if re.match(r'^[A-Za-z][A-Za-z0-9_.\-:]*$', line):
-                    tools.append(line)
-            detail["tools"] = tools
-    except Exception:
-        detail["tools"] = []
-
-    # === Version ===
-    try:
-        match = re.search(r"Version\s*\n\s*([\d.]+)", body)
-        if match:
-            detail["version"] = match.group(1)
-    except Exception:
-        pass
-
-    # === Connector URL ===
-    try:
-        match = re.search(r"Connector URL\s*\n\s*(https?://\S+)", body)
-        if match:
-            detail["connector_url"] = match.group(1).strip()
-    except Exception:
-        pass
-
-    # === Author ===
-    try:
-        match = re.search(r"Author\s*\n\s*(.+?)(?:\n|$)", body)
-        if match:
-            author_name = match.group(1).strip()
-            author_url = ""
-            try:
-                all_links = page.locator("a[href^='http']")
-                for i in range(await all_links.count()):
-                    text = (await all_links.nth(i).text_content()).strip()
-                    if text == author_name:
-                        href = await all_links.nth(i).get_attribute("href")
-                        if href and "claude.ai" not in href:
-                            author_url = href
-                            break
-            except Exception:
-                pass
-            detail["author"] = {"name": author_name, "url": author_url}
-    except Exception:
-        pass
+    # === Developer / Author links ===
+    for key in ("developer", "author"):
+        if key in detail:
+            detail[key]["url"] = await find_external_link(page, detail[key]["name"])
 
     # === More info links ===
     try:
@@ -388,34 +1120,109 @@ def save_progress(connectors, errors):
         "errors": errors if errors else None,
         "connectors": connectors,
     }
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    # Write to a temp file and rename so a crash never leaves a torn file
+    with span("save_progress", connectors=len(connectors)):
+        tmp = OUTPUT_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, OUTPUT_FILE)
 
 
 def load_scraped_urls() -> set:
     """Load detail_urls already scraped (for resumption)."""
-    if not os.path.exists(OUTPUT_FILE):
-        return set()
-    try:
-        with open(OUTPUT_FILE, "r") as f:
-            data = json.load(f)
-        return set(c.get("detail_url", "") for c in data.get("connectors", []))
-    except Exception:
-        return set()
+    return set(c.get("detail_url", "") for c in load_connectors())
 
 
 def load_connectors() -> list:
-    """Load previously scraped connectors (for resumption)."""
-    if not os.path.exists(OUTPUT_FILE):
-        return []
+    """Load previously scraped connectors (for resumption), including any journal."""
+    connectors = []
+    if os.path.exists(OUTPUT_FILE):
+        try:
+            with open(OUTPUT_FILE, "r") as f:
+                data = json.load(f)
+            connectors = data.get("connectors", [])
+        except Exception:
+            connectors = []
+    journaled, _ = load_journal()
+    if not journaled:
+        return connectors
+    # Journal entries are newer than the compacted output
+    by_url = {c.get("detail_url", ""): c for c in connectors}
+    for c in journaled:
+        by_url[c.get("detail_url", "")] = c
+    return list(by_url.values())
+
+
+def load_errors() -> list:
+    """Errors recorded in OUTPUT_FILE by earlier runs."""
     try:
         with open(OUTPUT_FILE, "r") as f:
-            data = json.load(f)
-        return data.get("connectors", [])
+            return json.load(f).get("errors") or []
     except Exception:
         return []
 
 
+class ProgressJournal:
+    """
+    Append-only JSONL log of scrape results: one {"connector": ...} or
+    {"error": ..., "url": ...} line per event. Lines are flushed
+    immediately and fsynced every JOURNAL_FSYNC_EVERY records, so a crash
+    loses at most the tail of the file and never the earlier results.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, fsync_every=JOURNAL_FSYNC_EVERY):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.pending = 0
+        self.f = open(path, "a", encoding="utf-8")
+
+    def append(self, record):
+        with span("journal_append"):
+            self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.f.flush()
+            self.pending += 1
+            if self.pending >= self.fsync_every:
+                self.sync()
+
+    def sync(self):
+        os.fsync(self.f.fileno())
+        self.pending = 0
+
+    def close(self):
+        if not self.f.closed:
+            self.sync()
+            self.f.close()
+
+
+def load_journal(path=JOURNAL_FILE):
+    """Replay the journal into (connectors, errors). Skips a torn final line."""
+    connectors, errors = [], []
+    if not os.path.exists(path):
+        return connectors, errors
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if "connector" in record:
+                connectors.append(record["connector"])
+            elif "error" in record:
+                errors.append(record["error"])
+    return connectors, errors
+
+
+def compact_journal(connectors, errors):
+    """Write the final pretty JSON once (atomically), then drop the journal."""
+    save_progress(connectors, errors)
+    try:
+        os.remove(JOURNAL_FILE)
+    except OSError:
+        pass
+
+
 def save_index(cards):
     """Save the card index for resumption (Phase 1 output)."""
     with open(INDEX_FILE, "w", encoding="utf-8") as f:
@@ -434,44 +1241,966 @@ def load_index() -> list:
 
 
 # ---------------------------------------------------------------------------
-# Main scraping flow
+# Phase 2: Worker pool
 # ---------------------------------------------------------------------------
 
-async def scrape_directory(headless=False):
-    """Two-phase scraping: collect URLs, then visit each one."""
+def order_connectors(connectors, cards) -> list:
+    """Sort connectors into listing order so output is stable across runs."""
+    position = {c["detail_url"]: i for i, c in enumerate(cards)}
+    return sorted(connectors, key=lambda c: position.get(c.get("detail_url", ""), len(position)))
+
+
+async def scrape_card(page, card) -> dict:
+    """Visit one detail URL and merge the listing card with the scraped detail."""
+    url = card["detail_url"]
+    with span("goto"):
+        await page.goto(url, wait_until="networkidle")
+
+    with span("scrape_detail"):
+        detail, snap = await scrape_detail(page)
+
+    if record_dir and detail:
+        await snapshot_page(page, os.path.join("detail", card_uuid(card) + ".html"))
+    if body_dir and detail:
+        await save_body_snapshot(page, card, snap)
+
+    return merge_connector(card, detail)
+
+
+def merge_connector(card, detail) -> dict:
+    """Merge listing info with detail info into the output record."""
+    return {
+        "name": detail.get("name") or card["name"],
+        "tagline": detail.get("tagline") or card.get("tagline", ""),
+        "description": detail.get("description", ""),
+        "logo_url": card.get("logo_url", ""),
+        "detail_url": card["detail_url"],
+        "developer": detail.get("developer", {}),
+        "tools": detail.get("tools", []),
+        "version": detail.get("version", ""),
+        "connector_url": detail.get("connector_url", ""),
+        "author": detail.get("author", {}),
+        "more_info": detail.get("more_info", {}),
+    }
+
+
+def backoff_delay(attempt) -> float:
+    """Exponential backoff with jitter for the retry after `attempt` failed."""
+    cap = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1))
+    return random.uniform(cap / 2, cap)
+
+
+class TokenBucket:
+    """Token bucket: `rate` acquisitions per second with bursts up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD cap on in-flight detail pages. The limit is halved only after
+    SLOW_STREAK pages in a row failed or took more than twice the median
+    of the last LATENCY_WINDOW pages (slow ones included, so the baseline
+    follows the load the current concurrency causes instead of drifting
+    low); one outlier is not congestion. Pages that were already in
+    flight when the limit dropped are not held against the new limit.
+    Every `limit` consecutive healthy pages raise it by one, up to
+    max_limit.
+    """
+
+    SLOW_STREAK = 3
+    LATENCY_WINDOW = 100
+    MIN_SAMPLES = 5  # before any page can count as slow
+
+    def __init__(self, max_limit, min_limit=1):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = max_limit
+        self.active = 0
+        self.latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.streak = 0
+        self.healthy = 0
+        self.grace = 0  # completions to skip after a back-off
+        self.cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def __aexit__(self, *exc):
+        async with self.cond:
+            self.active -= 1
+            self.cond.notify_all()
+
+    def record(self, ok, latency):
+        slow = (ok and len(self.latencies) >= self.MIN_SAMPLES
+                and latency > 2 * statistics.median(self.latencies))
+        if ok:
+            self.latencies.append(latency)
+        if self.grace:
+            self.grace -= 1
+            return
+        if not ok or slow:
+            self.streak += 1
+            self.healthy = 0
+            if self.streak >= self.SLOW_STREAK:
+                new_limit = max(self.min_limit, self.limit // 2)
+                if new_limit != self.limit:
+                    print(f"    (backing off: concurrency {self.limit} -> {new_limit})")
+                    self.grace = self.active
+                self.limit = new_limit
+                self.streak = 0
+            return
+        self.streak = 0
+        self.healthy += 1
+        if self.healthy >= self.limit and self.limit < self.max_limit:
+            self.limit += 1
+            self.healthy = 0
+
+
+async def scrape_cards(context, page, cards, scraped_urls, connectors, errors, concurrency=1,
+                       journal=None, max_attempts=MAX_ATTEMPTS, rate=RATE_LIMIT):
+    """
+    Scrape every card not yet in scraped_urls using up to `concurrency`
+    pages from the same browser context, fed by a shared work queue.
+
+    `connectors` and `errors` are extended in place and progress is saved
+    after each connector, in listing order, so a run interrupted at any
+    point resumes exactly like the sequential scraper did. With a
+    ProgressJournal, each result is appended to it instead of rewriting
+    OUTPUT_FILE.
+
+    Failed pages are re-queued with exponential backoff up to
+    max_attempts. Page starts are throttled by a per-host token bucket
+    (`rate` pages/s, None to disable), and the number of pages in flight
+    adapts to observed latency and failures. Every failed attempt is
+    recorded in `errors` as {url, name, attempt, error, message,
+    duration_ms, will_retry}.
+    """
+    total = len(cards)
+    queue = asyncio.Queue()
+    for idx, card in enumerate(cards):
+        if card["detail_url"] in scraped_urls:
+            print(f"  [{idx + 1}/{total}] {card['name']} -- already scraped, skip")
+            continue
+        queue.put_nowait((idx, card, 1))
+
+    if queue.empty():
+        return
+
+    n = max(1, min(concurrency, queue.qsize()))
+    limiter = AdaptiveLimiter(n)
+    buckets = {}
+
+    def persist(record):
+        if journal:
+            journal.append(record)
+        else:
+            save_progress(order_connectors(connectors, cards), errors)
+
+    async def retry_later(item, delay):
+        await asyncio.sleep(delay)
+        queue.put_nowait(item)
+        # Only now is the failed attempt done, so join() keeps waiting for it
+        queue.task_done()
+
+    async def worker(worker_page):
+        while True:
+            idx, card, attempt = await queue.get()
+            url = card["detail_url"]
+            retry = False
+            try:
+                host = urlparse(url).hostname or ""
+                if rate and host not in buckets:
+                    buckets[host] = TokenBucket(rate, burst=n)
+
+                async with limiter:
+                    if rate:
+                        await buckets[host].acquire()
+                    suffix = f" (attempt {attempt})" if attempt > 1 else ""
+                    print(f"  [{idx + 1}/{total}] {card['name']}{suffix}")
+                    started = time.monotonic()
+                    try:
+                        connector = await scrape_card(worker_page, card)
+                        failure = None
+                    except Exception as e:
+                        connector, failure = None, e
+                    duration = time.monotonic() - started
+                    limiter.record(failure is None, duration)
+                    record_span("connector", duration * 1000, url=url, name=card["name"],
+                                attempt=attempt, ok=failure is None)
+
+                if failure is None:
+                    # A refreshed connector replaces its previous record
+                    connectors[:] = [c for c in connectors if c.get("detail_url") != url]
+                    connectors.append(connector)
+                    scraped_urls.add(url)
+
+                    # Save after every connector
+                    persist({"connector": connector})
+
+                    tools_str = ", ".join(connector["tools"][:3])
+                    if len(connector["tools"]) > 3:
+                        tools_str += f" +{len(connector['tools']) - 3} more"
+                    print(f"    OK | {connector['name']} | {connector['tagline']} | tools: [{tools_str}]")
+                else:
+                    retry = attempt < max_attempts
+                    error = {
+                        "url": url,
+                        "name": card["name"],
+                        "attempt": attempt,
+                        "error": type(failure).__name__,
+                        "message": str(failure).splitlines()[0] if str(failure) else "",
+                        "duration_ms": round(duration * 1000),
+                        "will_retry": retry,
+                    }
+                    errors.append(error)
+                    persist({"error": error, "url": url})
+                    if retry:
+                        delay = backoff_delay(attempt)
+                        print(f"    ERROR: {card['name']}: {error['error']}: {error['message']} "
+                              f"-- retrying in {delay:.1f}s")
+                        asyncio.ensure_future(retry_later((idx, card, attempt + 1), delay))
+                    else:
+                        print(f"    ERROR: {card['name']}: {error['error']}: {error['message']} -- giving up")
+            finally:
+                if not retry:
+                    queue.task_done()
+
+    pages = [page] + [await new_page(context) for _ in range(n - 1)]
+    if n > 1:
+        print(f"  Scraping with up to {n} concurrent pages\n")
+    workers = [asyncio.ensure_future(worker(p)) for p in pages]
+    try:
+        await queue.join()
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for extra in pages[1:]:
+            await extra.close()
+
+
+# ---------------------------------------------------------------------------
+# API capture: record registry JSON responses instead of parsing the DOM
+# ---------------------------------------------------------------------------
+
+def extract_registry_entries(payload, depth=0) -> list:
+    """
+    Find raw registry entries ({server, _meta: {REGISTRY_META_KEY: ...}})
+    anywhere inside a JSON response body.
+    """
+    if depth > 6:
+        return []
+    if isinstance(payload, dict):
+        meta = payload.get("_meta")
+        if isinstance(payload.get("server"), dict) and isinstance(meta, dict) and REGISTRY_META_KEY in meta:
+            return [payload]
+        found = []
+        for value in payload.values():
+            found.extend(extract_registry_entries(value, depth + 1))
+        return found
+    if isinstance(payload, list):
+        found = []
+        for item in payload:
+            found.extend(extract_registry_entries(item, depth + 1))
+        return found
+    return []
+
+
+def registry_uuid(entry) -> str:
+    """uuid of a raw registry entry ('' if missing)."""
+    return entry.get("_meta", {}).get(REGISTRY_META_KEY, {}).get("uuid", "")
+
+
+def card_uuid(card) -> str:
+    """uuid at the end of a card's detail_url."""
+    return card["detail_url"].rstrip("/").rsplit("/", 1)[-1]
+
+
+def attach_api_capture(context, captured: dict):
+    """
+    Listen to every JSON response in the context and store registry
+    entries in `captured` keyed by uuid. Returns an async flush() that
+    waits for in-flight response bodies to be parsed.
+    """
+    pending = set()
+
+    async def handle(response):
+        if response.request.resource_type not in ("fetch", "xhr"):
+            return
+        if "json" not in (response.headers.get("content-type") or ""):
+            return
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        for entry in extract_registry_entries(payload):
+            uuid = registry_uuid(entry)
+            if uuid:
+                captured[uuid] = entry
+
+    def on_response(response):
+        task = asyncio.ensure_future(handle(response))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    context.on("response", on_response)
+
+    async def flush():
+        if pending:
+            await asyncio.gather(*list(pending), return_exceptions=True)
+
+    return flush
+
+
+def save_captured(captured: dict):
+    """Write captured entries in the mcp-raw.json shape."""
+    output = {
+        "servers": list(captured.values()),
+        "metadata": {
+            "count": len(captured),
+            "captured_at": datetime.utcnow().isoformat() + "Z",
+        },
+    }
+    with open(CAPTURE_FILE, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+
+
+def load_captured() -> dict:
+    """Load previously captured entries keyed by uuid (for resumption)."""
+    if not os.path.exists(CAPTURE_FILE):
+        return {}
+    try:
+        with open(CAPTURE_FILE, "r") as f:
+            data = json.load(f)
+        return {registry_uuid(e): e for e in data.get("servers", []) if registry_uuid(e)}
+    except Exception:
+        return {}
+
+
+# ---------------------------------------------------------------------------
+# Incremental refresh: per-card change fingerprints
+# ---------------------------------------------------------------------------
+
+def card_fingerprint(card, entry=None) -> str:
+    """
+    Hash the listing fields that change when a connector is updated.
+    With a captured registry entry, its version and updatedOn are included
+    too, so edits that don't touch the card itself are still detected.
+    """
+    parts = [card.get("name", ""), card.get("tagline", ""), card.get("logo_url", "")]
+    if entry:
+        reg = entry.get("_meta", {}).get(REGISTRY_META_KEY, {})
+        parts += [entry.get("server", {}).get("version", ""), reg.get("updatedOn", "")]
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def diff_fingerprints(cards, store, captured=None):
+    """
+    Compare the current listing against the fingerprint store.
+    Returns (new, changed, removed, fingerprints): lists of detail_urls
+    plus the fresh fingerprint for every current card.
+    """
+    captured = captured or {}
+    known = store.get("connectors", {})
+    fingerprints = {c["detail_url"]: card_fingerprint(c, captured.get(card_uuid(c))) for c in cards}
+
+    new, changed = [], []
+    for url, fp in fingerprints.items():
+        prev = known.get(url)
+        if prev is None:
+            new.append(url)
+        elif prev.get("fingerprint") != fp or prev.get("removed_at"):
+            changed.append(url)
+    removed = [url for url, prev in known.items()
+               if url not in fingerprints and not prev.get("removed_at")]
+    return new, changed, removed, fingerprints
+
+
+def load_fingerprints() -> dict:
+    """Load the fingerprint store ({} if missing)."""
+    if not os.path.exists(FINGERPRINT_FILE):
+        return {}
+    try:
+        with open(FINGERPRINT_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_fingerprints(store):
+    """Write the fingerprint store."""
+    store["updated_at"] = datetime.utcnow().isoformat() + "Z"
+    with open(FINGERPRINT_FILE, "w", encoding="utf-8") as f:
+        json.dump(store, f, indent=2, ensure_ascii=False)
+
+
+def tombstone(connectors, removed_urls, now):
+    """Mark connectors that disappeared from the listing with removed_at."""
+    removed = set(removed_urls)
+    for c in connectors:
+        if c.get("detail_url") in removed and not c.get("removed_at"):
+            c["removed_at"] = now
+
+
+# ---------------------------------------------------------------------------
+# Fixture recording (--record DIR) for offline replay with bench_scraper.py
+# ---------------------------------------------------------------------------
+
+record_dir = None  # Set by start_recording(); snapshots are written here
+
+# Rendered DOM without scripts, so a replayed page is static and deterministic
+SNAPSHOT_JS = """() => {
+    const root = document.documentElement.cloneNode(true);
+    root.querySelectorAll('script, link[rel="preload"], link[rel="modulepreload"]')
+        .forEach(el => el.remove());
+    return '<!DOCTYPE html>\\n' + root.outerHTML;
+}"""
+
+
+def start_recording(context, path):
+    """
+    Record fixtures into `path`: listing.html, detail/<uuid>.html,
+    cards.json and every JSON fetch/xhr response in responses.jsonl.
+    """
+    global record_dir
+    record_dir = path
+    os.makedirs(os.path.join(path, "detail"), exist_ok=True)
+    responses = open(os.path.join(path, "responses.jsonl"), "a", encoding="utf-8")
+
+    async def on_response(response):
+        if response.request.resource_type not in ("fetch", "xhr"):
+            return
+        content_type = response.headers.get("content-type") or ""
+        if "json" not in content_type:
+            return
+        try:
+            body = await response.text()
+        except Exception:
+            return
+        responses.write(json.dumps({
+            "url": response.url,
+            "status": response.status,
+            "content_type": content_type,
+            "body": body,
+        }, ensure_ascii=False) + "\n")
+        responses.flush()
+
+    context.on("response", on_response)
+    context.on("close", lambda _: responses.close())
+
+
+async def snapshot_page(page, name):
+    """Save the current page's rendered, script-free HTML under record_dir."""
+    html = await page.evaluate(SNAPSHOT_JS)
+    with open(os.path.join(record_dir, name), "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def record_cards(cards):
+    """Save the Phase 1 card list alongside the listing snapshot."""
+    with open(os.path.join(record_dir, "cards.json"), "w", encoding="utf-8") as f:
+        json.dump(cards, f, indent=2, ensure_ascii=False)
+
+
+# ---------------------------------------------------------------------------
+# Body snapshots: re-parse stored detail text without a browser
+# ---------------------------------------------------------------------------
+
+body_dir = None  # Set by --save-bodies; one JSON snapshot per detail page
+
+async def save_body_snapshot(page, card, snap=None):
+    """
+    Store the detail page's text and links under body_dir. `snap` is the
+    snapshot scrape_detail already took; the page is only read again when
+    the locator fallback was used.
+    """
+    if snap is None:
+        snap = await page.evaluate(DETAIL_SNAPSHOT_JS)
+    snap = {**snap, "detail_url": card["detail_url"]}
+    with open(os.path.join(body_dir, card_uuid(card) + ".json"), "w", encoding="utf-8") as f:
+        json.dump(snap, f, ensure_ascii=False)
+
+
+def reparse_bodies():
+    """
+    Re-run parse_detail_body over every snapshot in BODY_DIR and rewrite
+    the matching connectors in OUTPUT_FILE. No browser is started.
+    Recorded errors are kept; a pending journal is folded in and removed,
+    so it cannot replay stale entries over the re-parsed output.
+    """
+    if not os.path.isdir(BODY_DIR):
+        print(f"No body snapshots in {BODY_DIR}/. Scrape once with --save-bodies.")
+        return
+    connectors = load_connectors()  # includes the journal
+    errors = load_errors() + load_journal()[1]
+    by_url = {c.get("detail_url", ""): c for c in connectors}
+
+    started = time.monotonic()
+    updated = 0
+    for name in sorted(os.listdir(BODY_DIR)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(BODY_DIR, name), "r", encoding="utf-8") as f:
+            snap = json.load(f)
+        url = snap.get("detail_url", "")
+        card = by_url.get(url) or {"name": "", "detail_url": url}
+        by_url[url] = {**card, **merge_connector(card, parse_snapshot(snap))}
+        updated += 1
+    elapsed = time.monotonic() - started
+
+    compact_journal(list(by_url.values()), errors)
+    print(f"Re-parsed {updated} body snapshots in {elapsed * 1000:.0f} ms -> {OUTPUT_FILE}")
+
+
+# ---------------------------------------------------------------------------
+# Extraction benchmark
+# ---------------------------------------------------------------------------
+
+async def benchmark_extraction(page, cards, repeats=5) -> dict:
+    """
+    Load each card's detail page once, then time extract_detail_snapshot
+    and extract_detail_dom `repeats` times each on the settled page.
+    Returns per-extractor latency stats in ms and the number of pages on
+    which both extractors disagreed.
+    """
+    timings = {"snapshot": [], "dom": []}
+    mismatches = 0
+    for card in cards:
+        await page.goto(card["detail_url"], wait_until="networkidle")
+        if not await wait_for_text(page, "Developed by", "developed by", fixed_ms=2000):
+            print(f"  {card['name']}: detail page did not load, skipped")
+            continue
+        await wait_for_dom_quiet(page, "detail settle", fixed_ms=1200)
+
+        results = {}
+        for name, extract in (("snapshot", extract_detail_snapshot), ("dom", extract_detail_dom)):
+            for _ in range(repeats):
+                started = time.perf_counter()
+                result = await extract(page)
+                timings[name].append((time.perf_counter() - started) * 1000)
+            results[name] = result[0] if name == "snapshot" else result
+        if results["snapshot"] != results["dom"]:
+            mismatches += 1
+            print(f"  {card['name']}: extractors disagree")
+
+    report = {"pages": len(cards), "repeats": repeats, "mismatches": mismatches}
+    for name, values in timings.items():
+        if values:
+            report[name] = {
+                "mean_ms": round(statistics.mean(values), 2),
+                "p50_ms": round(statistics.median(values), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+            }
+    return report
+
+
+async def run_extraction_benchmark(headless=False, pages=10, repeats=5):
+    """Benchmark both detail extractors on the first `pages` indexed cards."""
+    cards = load_index()[:pages]
+    if not cards:
+        print(f"No card index found. Run a scrape first to create {INDEX_FILE}.")
+        return
     async with async_playwright() as p:
-        context = await p.chromium.launch_persistent_context(
-            USER_DATA_DIR,
+        context = await launch_context(p, headless)
+        page = await open_page(context)
+        print(f"Benchmarking extraction on {len(cards)} pages x {repeats} repeats...")
+        report = await benchmark_extraction(page, cards, repeats)
+        await close_context(context)
+
+    print("\n--- Extraction latency per page ---")
+    for name in ("snapshot", "dom"):
+        if name in report:
+            r = report[name]
+            print(f"  {name:<8} mean {r['mean_ms']:>8.1f} ms  p50 {r['p50_ms']:>8.1f} ms  p95 {r['p95_ms']:>8.1f} ms")
+    if "snapshot" in report and "dom" in report and report["snapshot"]["p50_ms"]:
+        print(f"  Speedup (p50): {report['dom']['p50_ms'] / report['snapshot']['p50_ms']:.1f}x")
+    print(f"  Pages where extractors disagree: {report['mismatches']}")
+
+
+async def run_network_comparison(headless=False, pages=10, rules=RESOURCE_RULES) -> dict:
+    """
+    Visit the first `pages` indexed detail pages once per filter mode (off,
+    route, cdp), each in a fresh browser with a cold cache and the exported
+    session, and compare requests, cache hits and bytes on the wire.
+    """
+    cards = load_index()[:pages]
+    if not cards:
+        print(f"No card index found. Run a scrape first to create {INDEX_FILE}.")
+        return {}
+    fd, state_path = tempfile.mkstemp(prefix="scrap_connectors-", suffix=".json")
+    os.close(fd)
+    results = {}
+    try:
+        async with async_playwright() as p:
+            context = await launch_context(p, headless)
+            await context.storage_state(path=state_path)
+            await close_context(context)
+
+            for mode in ("off", "route", "cdp"):
+                reset_net_stats()
+                browser = await p.chromium.launch(
+                    headless=headless,
+                    args=["--disable-blink-features=AutomationControlled"],
+                    ignore_default_args=["--enable-automation"],
+                )
+                context = await browser.new_context(storage_state=state_path,
+                                                    viewport={"width": 1280, "height": 900})
+                await install_network_filter(context, None if mode == "off" else {**rules, "mode": mode})
+                page = await new_page(context)
+                started = time.monotonic()
+                for card in cards:
+                    await page.goto(card["detail_url"], wait_until="networkidle")
+                    await wait_for_text(page, "Developed by", "developed by", fixed_ms=2000)
+                elapsed = time.monotonic() - started
+                await browser.close()
+                results[mode] = {**net_stats, "seconds": round(elapsed, 1)}
+    finally:
+        os.remove(state_path)  # holds the session cookies
+
+    print(f"\n--- Network by filter mode ({len(cards)} detail pages, cold cache) ---")
+    for mode, r in results.items():
+        print(f"  {mode:<6} {r['requests']:>5} requests  {r['cached']:>5} from cache  "
+              f"{r['blocked']:>5} blocked  {r['bytes'] / 1024 / 1024:>7.2f} MB  {r['seconds']:>6.1f}s")
+    best = min(results, key=lambda m: results[m]["bytes"])
+    print(f"  Fewest bytes: {best}")
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Sharded scraping: K worker processes sharing an exported session
+# ---------------------------------------------------------------------------
+
+def shard_journals() -> list:
+    """Paths of per-worker journals left in the working directory."""
+    prefix, suffix = SHARD_JOURNAL.split("{}")
+    return sorted(f for f in os.listdir(".") if f.startswith(prefix) and f.endswith(suffix))
+
+
+def merge_shards(cards) -> int:
+    """
+    Fold every shard journal into OUTPUT_FILE (listing order, atomic write)
+    and delete the journals. Returns the number of connectors merged in.
+    """
+    paths = shard_journals()
+    if not paths:
+        return 0
+    connectors = load_connectors()
+    by_url = {c.get("detail_url", ""): c for c in connectors}
+    errors = load_errors()
+    merged = 0
+    for path in paths:
+        shard_connectors, shard_errors = load_journal(path)
+        for c in shard_connectors:
+            by_url[c.get("detail_url", "")] = c
+            merged += 1
+        errors.extend(shard_errors)
+    save_progress(order_connectors(list(by_url.values()), cards), errors)
+    for path in paths:
+        os.remove(path)
+    return merged
+
+
+async def scrape_shard(index, shards, state_file, headless=False, concurrency=1, rules=RESOURCE_RULES,
+                       budget_mb=None, max_attempts=MAX_ATTEMPTS, rate=RATE_LIMIT):
+    """
+    Worker: scrape every `shards`-th pending card starting at `index` in a
+    fresh (non-persistent) browser loaded with the coordinator's exported
+    session (`state_file`), appending results to this worker's shard journal.
+    """
+    cards = load_index()
+    scraped_urls = load_scraped_urls()
+    pending = [c for c in cards if c["detail_url"] not in scraped_urls]
+    mine = pending[index::shards]
+    print(f"[shard {index}] {len(mine)} of {len(pending)} pending connectors")
+    if not mine:
+        return
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(
             headless=headless,
-            viewport={"width": 1280, "height": 900},
-            slow_mo=100,
             args=["--disable-blink-features=AutomationControlled"],
             ignore_default_args=["--enable-automation"],
         )
-        page = context.pages[0] if context.pages else await context.new_page()
+        context = await browser.new_context(
+            storage_state=state_file,
+            viewport={"width": 1280, "height": 900},
+        )
+        await install_network_filter(context, rules, budget_mb)
+        page = await new_page(context)
 
-        # ---------------------------------------------------------------
-        # Phase 1: Collect card URLs from the listing
-        # ---------------------------------------------------------------
-        # Check if we already have an index from a previous run
+        journal = ProgressJournal(SHARD_JOURNAL.format(index))
+        try:
+            with span("shard", shard=index, cards=len(mine)):
+                await scrape_cards(context, page, mine, scraped_urls, [], [],
+                                   concurrency=concurrency, journal=journal,
+                                   max_attempts=max_attempts, rate=rate)
+        finally:
+            journal.close()
+            await browser.close()
+            write_shard_report(index)
+
+
+async def scrape_sharded(shards, headless=False, worker_args=()):
+    """
+    Coordinator: build the card index and export the logged-in session from
+    the persistent profile, run `shards` worker processes over slices of
+    the pending cards, then merge their journals into OUTPUT_FILE and
+    their spans into REPORT_FILE.
+    """
+    # The exported session holds login cookies: keep it in a private temp
+    # file (mode 0600) and delete it once the workers are done.
+    fd, state_file = tempfile.mkstemp(prefix="scrap_connectors-state-", suffix=".json")
+    os.close(fd)
+    try:
+        await run_sharded(shards, state_file, headless, worker_args)
+    finally:
+        os.remove(state_file)
+
+
+async def run_sharded(shards, state_file, headless, worker_args):
+    """scrape_sharded() with the session exported to `state_file`."""
+    started = time.monotonic()
+    async with async_playwright() as p:
+        context = await launch_context(p, headless)
+        page = await open_page(context)
         cards = load_index()
         if cards:
             print(f"Loaded {len(cards)} cards from previous index ({INDEX_FILE})")
         else:
-            print("Phase 1: Collecting connector URLs from listing...")
+            cards = await collect_index(page)
+        await context.storage_state(path=state_file)
+        await close_context(context)
+
+    if not cards:
+        print("No cards found! Check login and Web tab.")
+        return
+
+    # Results from an interrupted sharded run are folded in first so that
+    # every worker computes the same pending list.
+    recovered = merge_shards(cards)
+    if recovered:
+        print(f"Recovered {recovered} connectors from previous shard journals")
+
+    for path in shard_reports():  # left by an interrupted run
+        os.remove(path)
+    print(f"Starting {shards} worker processes...\n")
+    with span("phase2", shards=shards):
+        procs = [
+            await asyncio.create_subprocess_exec(
+                sys.executable, os.path.abspath(__file__), *worker_args,
+                "--shards", str(shards), "--worker", str(i), "--state-file", state_file,
+            )
+            for i in range(shards)
+        ]
+        codes = await asyncio.gather(*(proc.wait() for proc in procs))
+    for i, code in enumerate(codes):
+        if code:
+            print(f"  shard {i} exited with code {code}")
+
+    merged = merge_shards(cards)
+    total = len(load_connectors())
+    print(f"\nDone! Merged {merged} connectors from {shards} shards, {total} total -> {OUTPUT_FILE}")
+    reports = merge_shard_reports()
+    print_wait_summary()
+    print_net_summary()
+    print_stage_summary()
+    write_run_report(started, connectors=total, cards=len(cards), shards=shards,
+                     shard_reports=reports)
+    print(f"Run report -> {REPORT_FILE}")
+    if {c["detail_url"] for c in cards} <= load_scraped_urls():
+        try:
+            os.remove(INDEX_FILE)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Main scraping flow
+# ---------------------------------------------------------------------------
+
+# How launch_context() gets a browser: set from the CLI by main().
+#   endpoint: CDP URL of a running --daemon to attach to instead of launching
+#   fast:     drop slow_mo (only set for --headless runs)
+launch_options = {"endpoint": None, "fast": False}
+attached_pages = {}  # context -> pages that existed when we attached
+
+
+async def launch_context(p, headless):
+    """
+    Launch the persistent, logged-in Chromium context used for scraping,
+    or attach to the one a --daemon process keeps running.
+    """
+    if launch_options["endpoint"]:
+        browser = await p.chromium.connect_over_cdp(launch_options["endpoint"])
+        context = browser.contexts[0] if browser.contexts else await browser.new_context()
+        attached_pages[context] = set(context.pages)
+        return context
+    return await p.chromium.launch_persistent_context(
+        USER_DATA_DIR,
+        headless=headless,
+        viewport={"width": 1280, "height": 900},
+        slow_mo=0 if launch_options["fast"] else 100,
+        args=["--disable-blink-features=AutomationControlled"],
+        ignore_default_args=["--enable-automation"],
+    )
+
+
+async def open_page(context):
+    """First page of a launched context; a fresh tab in an attached one."""
+    if context in attached_pages or not context.pages:
+        return await new_page(context)
+    return context.pages[0]
+
+
+async def close_context(context):
+    """Close a launched context; for an attached one only close our own tabs."""
+    if context not in attached_pages:
+        await context.close()
+        return
+    for page in context.pages:
+        if page not in attached_pages[context]:
+            await page.close()
+    del attached_pages[context]
+
+
+async def run_daemon(headless=False, port=DAEMON_PORT):
+    """
+    Keep one logged-in persistent browser running with a CDP endpoint, so
+    later runs started with --connect skip Chromium startup and login.
+    """
+    endpoint = f"http://127.0.0.1:{port}"
+    async with async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(
+            USER_DATA_DIR,
+            headless=headless,
+            viewport={"width": 1280, "height": 900},
+            args=["--disable-blink-features=AutomationControlled",
+                  f"--remote-debugging-port={port}"],
+            ignore_default_args=["--enable-automation"],
+        )
+        with open(DAEMON_FILE, "w", encoding="utf-8") as f:
+            json.dump({"endpoint": endpoint, "pid": os.getpid(), "headless": headless,
+                       "started_at": datetime.utcnow().isoformat() + "Z"}, f, indent=2)
+        print(f"Browser daemon listening on {endpoint}")
+        print("Attach with: python3 scrap_connectors.py --connect   (Ctrl+C to stop)")
+        closed = asyncio.Event()
+        context.on("close", lambda _: closed.set())
+        try:
+            await closed.wait()
+        finally:
+            try:
+                os.remove(DAEMON_FILE)
+            except OSError:
+                pass
+            await context.close()
+
+
+def daemon_info() -> dict:
+    """What a running --daemon recorded: endpoint, pid, headless ({} if none)."""
+    try:
+        with open(DAEMON_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+async def collect_index(page) -> list:
+    """Phase 1: open the listing, select the Web tab and collect all cards."""
+    print("Phase 1: Collecting connector URLs from listing...")
+    with span("phase1"):
+        with span("listing_load"):
             await page.goto("https://claude.ai/directory", wait_until="networkidle")
-            await page.wait_for_timeout(3000)
+            await wait_for_text(page, "Web", "directory load", fixed_ms=3000)
 
-            print("  Clicking 'Web' tab...")
+        print("  Clicking 'Web' tab...")
+        with span("web_tab"):
             await click_web_tab(page)
 
+        print("  Scrolling and harvesting cards...")
+        with span("harvest"):
+            cards = await harvest_cards(page)
+        print(f"  Harvested {len(cards)} cards")
+
+        if not cards:
             print("  Scrolling to load all connectors...")
-            count = await scroll_to_load_all(page)
+            with span("scroll"):
+                count = await scroll_to_load_all(page)
             print(f"  Found ~{count} cards in DOM")
 
             print("  Extracting card data...")
-            cards = await collect_cards_from_listing(page)
-            save_index(cards)
+            with span("listing_extract"):
+                cards = await collect_cards_from_listing(page)
+    save_index(cards)
+    if record_dir:
+        await snapshot_page(page, "listing.html")
+        record_cards(cards)
+    return cards
+
+
+async def scrape_directory(headless=False, concurrency=1, capture_api=False,
+                           rules=RESOURCE_RULES, budget_mb=None, use_journal=False,
+                           refresh=False, max_attempts=MAX_ATTEMPTS, rate=RATE_LIMIT,
+                           trace=False, record=None):
+    """
+    Two-phase scraping: collect URLs, then visit each one.
+
+    With refresh=True the listing is always re-read and only connectors
+    whose card fingerprint is new or changed are visited again; ones that
+    left the listing are tombstoned with removed_at.
+
+    Stage timings are written to REPORT_FILE at the end; trace=True also
+    records a Playwright trace to TRACE_FILE.
+    """
+    started = time.monotonic()
+    async with async_playwright() as p:
+        context = await launch_context(p, headless)
+        page = await open_page(context)
+        await install_network_filter(context, rules, budget_mb)
+        if trace:
+            await context.tracing.start(screenshots=True, snapshots=True)
+        if record:
+            start_recording(context, record)
+
+        captured = {}
+        flush_capture = None
+        if capture_api:
+            captured = load_captured()
+            flush_capture = attach_api_capture(context, captured)
+
+        # ---------------------------------------------------------------
+        # Phase 1: Collect card URLs from the listing
+        # ---------------------------------------------------------------
+        # Check if we already have an index from a previous run (not when
+        # recording: the fixtures need the listing page itself)
+        cards = [] if refresh or record else load_index()
+        if cards:
+            print(f"Loaded {len(cards)} cards from previous index ({INDEX_FILE})")
+        else:
+            cards = await collect_index(page)
+
+        if capture_api:
+            await flush_capture()
+            save_captured(captured)
+            print(f"Captured {len(captured)} registry entries -> {CAPTURE_FILE}")
 
         print(f"\nFound {len(cards)} connectors:")
         for i, c in enumerate(cards):
@@ -480,86 +2209,105 @@ async def scrape_directory(headless=False):
 
         if not cards:
             print("No cards found! Check login and Web tab.")
-            await context.close()
+            await close_context(context)
             return
 
         # ---------------------------------------------------------------
         # Phase 2: Visit each detail URL and scrape
         # ---------------------------------------------------------------
+        # Connectors already present in the captured registry JSON need no
+        # detail navigation at all.
+        detail_cards = [c for c in cards if card_uuid(c) not in captured]
+        if capture_api:
+            print(f"{len(cards) - len(detail_cards)} connectors covered by captured API data, "
+                  f"{len(detail_cards)} need a detail visit\n")
+
         scraped_urls = load_scraped_urls()
         connectors = load_connectors()
         errors = []
 
-        already = len(scraped_urls)
-        if already:
-            print(f"Resuming: {already} already scraped, {len(cards) - already} remaining\n")
+        if refresh:
+            store = load_fingerprints()
+            new, changed, removed, fingerprints = diff_fingerprints(cards, store, captured)
+            print(f"Refresh: {len(new)} new, {len(changed)} changed, {len(removed)} removed, "
+                  f"{len(cards) - len(new) - len(changed)} unchanged\n")
+            # Changed connectors keep their old record until the re-scrape succeeds
+            scraped_urls.difference_update(changed)
+            tombstone(connectors, removed, datetime.utcnow().isoformat() + "Z")
 
-        for idx, card in enumerate(cards):
-            url = card["detail_url"]
+        remaining = sum(1 for c in detail_cards if c["detail_url"] not in scraped_urls)
+        if remaining < len(detail_cards):
+            print(f"Resuming: {len(detail_cards) - remaining} already scraped, {remaining} remaining\n")
 
-            if url in scraped_urls:
-                print(f"  [{idx + 1}/{len(cards)}] {card['name']} -- already scraped, skip")
-                continue
-
-            print(f"  [{idx + 1}/{len(cards)}] {card['name']}")
+        # An existing journal means the last run was interrupted in journal mode
+        use_journal = use_journal or os.path.exists(JOURNAL_FILE)
 
+        if detail_cards:
+            journal = ProgressJournal() if use_journal else None
             try:
-                await page.goto(url, wait_until="networkidle")
-                await page.wait_for_timeout(2000)
-
-                detail = await scrape_detail(page)
-
-                # Merge listing info with detail info
-                connector = {
-                    "name": detail.get("name") or card["name"],
-                    "tagline": detail.get("tagline") or card.get("tagline", ""),
-                    "description": detail.get("description", ""),
-                    "logo_url": card.get("logo_url", ""),
-                    "detail_url": url,
-                    "developer": detail.get("developer", {}),
-                    "tools": detail.get("tools", []),
-                    "version": detail.get("version", ""),
-                    "connector_url": detail.get("connector_url", ""),
-                    "author": detail.get("author", {}),
-                    "more_info": detail.get("more_info", {}),
-                }
-
-                connectors.append(connector)
-                scraped_urls.add(url)
-
-                # Save after every connector
+                with span("phase2", cards=len(detail_cards)):
+                    await scrape_cards(context, page, detail_cards, scraped_urls, connectors, errors,
+                                       concurrency=concurrency, journal=journal,
+                                       max_attempts=max_attempts, rate=rate)
+            finally:
+                if journal:
+                    journal.close()
+
+        if detail_cards or refresh or os.path.exists(JOURNAL_FILE):
+            # Final save
+            connectors = order_connectors(connectors, cards)
+            if use_journal:
+                compact_journal(connectors, errors)
+            else:
                 save_progress(connectors, errors)
 
-                tools_str = ", ".join(connector["tools"][:3])
-                if len(connector["tools"]) > 3:
-                    tools_str += f" +{len(connector['tools']) - 3} more"
-                print(f"    OK | {connector['tagline']} | tools: [{tools_str}]")
-
-            except Exception as e:
-                error_msg = f"{card['name']} ({url}): {e}"
-                print(f"    ERROR: {e}")
-                errors.append(error_msg)
-                save_progress(connectors, errors)
-
-        # Final save
-        save_progress(connectors, errors)
-
-        print(f"\nDone! Scraped {len(connectors)} connectors -> {OUTPUT_FILE}")
-        if errors:
-            print(f"   {len(errors)} errors (see 'errors' in JSON)")
-
-        # Clean up index file after successful full scrape
-        if len(connectors) >= len(cards):
+            print(f"\nDone! Scraped {len(connectors)} connectors -> {OUTPUT_FILE}")
+            if errors:
+                failed = sum(1 for e in errors if not e.get("will_retry"))
+                print(f"   {len(errors)} failed attempts, {failed} connectors gave up (see 'errors' in JSON)")
+
+        if refresh:
+            # Only record fingerprints for cards that are now up to date, so a
+            # failed re-scrape is retried on the next refresh.
+            known = store.setdefault("connectors", {})
+            now = datetime.utcnow().isoformat() + "Z"
+            for card in cards:
+                url = card["detail_url"]
+                if url in scraped_urls or card_uuid(card) in captured:
+                    known[url] = {"name": card["name"], "fingerprint": fingerprints[url], "seen_at": now}
+            for url in removed:
+                known[url]["removed_at"] = now
+            save_fingerprints(store)
+
+        if capture_api:
+            await flush_capture()
+            save_captured(captured)
+            print(f"Done! Captured {len(captured)} registry entries -> {CAPTURE_FILE}")
+        print_wait_summary()
+        print_net_summary()
+        print_stage_summary()
+        write_run_report(started, connectors=len(connectors), cards=len(cards),
+                         detail_visits=len(detail_cards), errors=len(errors),
+                         concurrency=concurrency)
+        print(f"Run report -> {REPORT_FILE}")
+
+        # Clean up index file once every detail page has been scraped
+        # (connectors also holds captured and older entries, so counts lie)
+        if {c["detail_url"] for c in detail_cards} <= scraped_urls:
             try:
                 os.remove(INDEX_FILE)
             except OSError:
                 pass
 
-        await context.close()
+        if trace:
+            await context.tracing.stop(path=TRACE_FILE)
+            print(f"Playwright trace -> {TRACE_FILE} (open with: playwright show-trace {TRACE_FILE})")
+        await close_context(context)
         return
 
 
 async def main():
+    global body_dir
     parser = argparse.ArgumentParser(description="Scrape Claude MCP Connectors Directory")
     parser.add_argument("--login", action="store_true",
                         help="Open browser for manual login first")
@@ -567,23 +2315,154 @@ async def main():
                         help="Run headless (use after login)")
     parser.add_argument("--fresh", action="store_true",
                         help="Ignore previous progress, start from scratch")
+    parser.add_argument("--concurrency", type=int, default=1, metavar="N",
+                        help="Scrape detail pages with N pages in parallel (default: 1)")
+    parser.add_argument("--retries", type=int, default=MAX_ATTEMPTS - 1, metavar="N",
+                        help=f"Retry a failed detail page up to N times with backoff (default: {MAX_ATTEMPTS - 1})")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT, metavar="R",
+                        help="Max detail pages started per second per host, split across --shards "
+                             f"workers; 0 = unlimited (default: {RATE_LIMIT})")
+    parser.add_argument("--capture-api", action="store_true",
+                        help="Record registry JSON responses to mcp-raw-captured.json "
+                             "and skip detail pages they cover")
+    parser.add_argument("--no-block", action="store_true",
+                        help="Load every resource (disable the request filter)")
+    parser.add_argument("--deny-types", metavar="TYPES",
+                        help="Comma-separated resource types to block "
+                             f"(default: {','.join(RESOURCE_RULES['deny_types'])})")
+    parser.add_argument("--allow-types", metavar="TYPES",
+                        help="Comma-separated resource types to always allow")
+    parser.add_argument("--deny-hosts", metavar="HOSTS",
+                        help="Comma-separated extra hosts to block")
+    parser.add_argument("--allow-hosts", metavar="HOSTS",
+                        help="Comma-separated hosts to always allow")
+    parser.add_argument("--block-mode", choices=["cdp", "route"], default=RESOURCE_RULES["mode"],
+                        help="cdp: block by URL pattern, keeps the HTTP cache; route: per-request "
+                             f"decisions, disables the cache (default: {RESOURCE_RULES['mode']})")
+    parser.add_argument("--budget-mb", type=float, metavar="MB",
+                        help="Warn when the run transfers more than MB megabytes")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Re-read the listing and only re-scrape new or changed connectors")
+    parser.add_argument("--journal", action="store_true",
+                        help=f"Append progress to {JOURNAL_FILE} and write {OUTPUT_FILE} once at the end")
+    parser.add_argument("--trace", action="store_true",
+                        help=f"Record a Playwright trace to {TRACE_FILE}")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Save listing/detail HTML and API responses to DIR for bench_scraper.py")
+    parser.add_argument("--save-bodies", action="store_true",
+                        help=f"Store each detail page's text and links in {BODY_DIR}/")
+    parser.add_argument("--reparse", action="store_true",
+                        help=f"Re-parse {BODY_DIR}/ into {OUTPUT_FILE} without a browser")
+    parser.add_argument("--bench-extract", type=int, metavar="N",
+                        help="Benchmark snapshot vs locator detail extraction on N indexed cards")
+    parser.add_argument("--net-compare", type=int, metavar="N",
+                        help="Compare bytes transferred with no filter, route and cdp blocking on N indexed cards")
+    parser.add_argument("--daemon", action="store_true",
+                        help=f"Keep a logged-in browser running with a CDP endpoint (port {DAEMON_PORT})")
+    parser.add_argument("--connect", nargs="?", const="", metavar="URL",
+                        help="Attach to a running --daemon over CDP (default: endpoint it recorded)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Headless speed profile: no slow_mo and no rate limit (ignored without "
+                             "--headless, or a headless --daemon when using --connect)")
+    parser.add_argument("--shards", type=int, metavar="K",
+                        help="Split Phase 2 across K browser processes sharing the exported session")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--state-file", help=argparse.SUPPRESS)
     args = parser.parse_args()
 
-    if args.login:
+    rules = None
+    if not args.no_block:
+        rules = {
+            "mode": args.block_mode,
+            "allow_types": split_csv(args.allow_types) if args.allow_types else RESOURCE_RULES["allow_types"],
+            "deny_types": split_csv(args.deny_types) if args.deny_types else RESOURCE_RULES["deny_types"],
+            "allow_hosts": RESOURCE_RULES["allow_hosts"] + split_csv(args.allow_hosts or ""),
+            "deny_hosts": RESOURCE_RULES["deny_hosts"] + split_csv(args.deny_hosts or ""),
+        }
+
+    if args.reparse:
+        reparse_bodies()
+        return
+
+    if args.connect is not None:
+        daemon = {} if args.connect else daemon_info()
+        launch_options["endpoint"] = args.connect or daemon.get("endpoint", "")
+        if not launch_options["endpoint"]:
+            print("No running daemon found. Start one with: python3 scrap_connectors.py --daemon")
+            return
+        # The daemon's browser is what runs headless or not
+        args.headless = args.headless or daemon.get("headless", False)
+    if args.fast and not args.headless:
+        print("--fast only applies to --headless runs; ignoring it")
+    elif args.fast:
+        launch_options["fast"] = True
+        if args.rate == RATE_LIMIT and args.worker is None:  # workers get their share
+            args.rate = 0
+
+    if args.save_bodies:
+        body_dir = BODY_DIR
+        os.makedirs(BODY_DIR, exist_ok=True)
+
+    if args.worker is not None:
+        await scrape_shard(args.worker, args.shards, args.state_file, headless=args.headless,
+                           concurrency=args.concurrency, rules=rules, budget_mb=args.budget_mb,
+                           max_attempts=args.retries + 1, rate=args.rate or None)
+    elif args.login:
         await login_flow()
     else:
-        if not os.path.exists(USER_DATA_DIR):
+        if not os.path.exists(USER_DATA_DIR) and not launch_options["endpoint"]:
             print("No saved session. Run with --login first:")
             print("   python3 scrap_connectors.py --login")
             return
 
+        if args.daemon:
+            await run_daemon(headless=args.headless)
+            return
+
+        if args.bench_extract:
+            await run_extraction_benchmark(headless=args.headless, pages=args.bench_extract)
+            return
+
+        if args.net_compare:
+            await run_network_comparison(headless=args.headless, pages=args.net_compare,
+                                         rules=rules or RESOURCE_RULES)
+            return
+
         if args.fresh:
-            for f in [OUTPUT_FILE, INDEX_FILE]:
+            for f in [OUTPUT_FILE, INDEX_FILE, CAPTURE_FILE, JOURNAL_FILE] + shard_journals():
                 if os.path.exists(f):
                     os.remove(f)
                     print(f"Removed {f}")
 
-        await scrape_directory(headless=args.headless)
+        if args.shards and args.shards > 1:
+            # Workers inherit the scraping options but never the one-off flags,
+            # nor what the parent owns: the daemon, trace, fixtures, re-parse
+            skip = {"--fresh", "--shards", "--journal", "--refresh", "--capture-api",
+                    "--connect", "--trace", "--record", "--reparse", "--rate"}
+            with_value = {"--shards", "--record", "--rate"}  # --connect takes one optionally
+            worker_args = []
+            argv = sys.argv[1:]
+            i = 0
+            while i < len(argv):
+                arg = argv[i]
+                i += 1
+                if arg.split("=", 1)[0] not in skip:
+                    worker_args.append(arg)
+                elif arg in with_value or (arg == "--connect" and i < len(argv)
+                                           and not argv[i].startswith("-")):
+                    i += 1  # its separate value
+            if args.headless and "--headless" not in worker_args:
+                worker_args.append("--headless")  # headless came from the --connect daemon
+            # Every worker has its own token bucket; split the host budget
+            worker_args.append(f"--rate={args.rate / args.shards}")
+            await scrape_sharded(args.shards, headless=args.headless, worker_args=worker_args)
+            return
+
+        await scrape_directory(headless=args.headless, concurrency=args.concurrency,
+                               capture_api=args.capture_api, rules=rules,
+                               budget_mb=args.budget_mb, use_journal=args.journal,
+                               refresh=args.refresh, max_attempts=args.retries + 1,
+                               rate=args.rate or None, trace=args.trace, record=args.record)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,304 @@
+"""
+Inverted search index over the transformed MCP connectors.
+
+transform_mcp.py --index builds the index while it writes
+mcp_connectors.json; this module holds the tokenizer, the builder and the
+query side, so a lookup only touches the postings of the query's terms
+instead of scanning every record.
+
+Usage:
+  1. Query:      python3 search_mcp.py "search meetings"
+  2. Benchmark:  python3 search_mcp.py --bench
+     (Times index lookups against a linear scan of mcp_connectors.json)
+
+Reads: mcp_search_index.json (written by transform_mcp.py --index), mcp_connectors.json (--bench)
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import statistics
+import time
+import unicodedata
+from collections import defaultdict
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = os.path.join(SCRIPT_DIR, "mcp_search_index.json")
+CONNECTORS_FILE = os.path.join(SCRIPT_DIR, "mcp_connectors.json")
+INDEX_VERSION = 1
+
+# Per-field weight of one occurrence of a term
+FIELD_WEIGHTS = {
+    "name": 5.0,
+    "tools": 2.0,
+    "use_cases": 2.0,
+    "one_liner": 1.5,
+    "description": 1.0,
+}
+MIN_PREFIX = 2      # shortest prefix in the prefix table
+MAX_PREFIX = 6      # longer tokens filter the completions of their first 6 chars
+PREFIX_TERMS = 20   # most frequent completions kept per shorter prefix
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or "
+    "that the this to with your you via".split()
+)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+
+# ---------------------------------------------------------------------------
+# Tokenizing
+# ---------------------------------------------------------------------------
+
+def normalize(text) -> str:
+    """Lowercase and strip accents."""
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text) -> list:
+    """Normalized word tokens, minus stopwords and single characters."""
+    return [t for t in TOKEN_RE.findall(normalize(text)) if len(t) > 1 and t not in STOPWORDS]
+
+
+def split_identifier(name) -> list:
+    """
+    Terms for a tool / use case identifier: its CamelCase and snake_case
+    parts plus the joined form, e.g. SearchMeetings -> search, meetings,
+    searchmeetings.
+    """
+    parts = tokenize(CAMEL_RE.sub(" ", name or ""))
+    joined = "".join(parts)
+    if len(parts) > 1 and joined not in parts:
+        parts.append(joined)
+    return parts
+
+
+def document_fields(c) -> dict:
+    """Indexed text of a connector, per weighted field, as term lists."""
+    caps = c.get("capabilities", {})
+    return {
+        "name": tokenize(c.get("name", "")) + split_identifier(c.get("slug", "")),
+        "tools": [t for tool in caps.get("tools", []) for t in split_identifier(tool)],
+        "use_cases": [t for case in caps.get("use_cases", []) for t in split_identifier(case)],
+        "one_liner": tokenize(c.get("one_liner", "")),
+        "description": tokenize(c.get("description", "")),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+class IndexBuilder:
+    """Accumulates postings one connector at a time (see transform_mcp)."""
+
+    def __init__(self):
+        self.docs = []
+        self.postings = defaultdict(list)  # term -> [doc, weight, doc, weight, ...]
+
+    def add(self, c):
+        doc = len(self.docs)
+        self.docs.append([c.get("uuid", ""), c.get("name", ""), c.get("slug", "")])
+        scores = defaultdict(float)
+        for field, terms in document_fields(c).items():
+            counts = defaultdict(int)
+            for term in terms:
+                counts[term] += 1
+            for term, tf in counts.items():
+                # Damped term frequency: repeating a word helps, but slowly
+                scores[term] += FIELD_WEIGHTS[field] * (1 + math.log(tf))
+        for term, score in scores.items():
+            self.postings[term].extend((doc, round(score * 10)))
+
+    def build(self) -> dict:
+        """
+        The index document. Terms are sorted and referred to by position;
+        `postings[i]` belongs to `terms[i]` and prefixes map to term ids,
+        most frequent first.
+        """
+        terms = sorted(self.postings)
+        prefixes = defaultdict(list)
+        for i, term in enumerate(terms):
+            for n in range(MIN_PREFIX, min(len(term), MAX_PREFIX) + 1):
+                prefixes[term[:n]].append(i)
+        df = [len(self.postings[t]) // 2 for t in terms]
+        table = {}
+        for prefix, ids in prefixes.items():
+            ids.sort(key=lambda i: (-df[i], i))
+            # Full lists at MAX_PREFIX, so longer tokens can filter them
+            table[prefix] = ids if len(prefix) == MAX_PREFIX else ids[:PREFIX_TERMS]
+        return {
+            "version": INDEX_VERSION,
+            "fields": FIELD_WEIGHTS,
+            "docs": self.docs,
+            "terms": terms,
+            "postings": [self.postings[t] for t in terms],
+            "prefixes": table,
+        }
+
+
+def build_index(connectors) -> dict:
+    """Build a ready-to-query index in memory."""
+    builder = IndexBuilder()
+    for c in connectors:
+        builder.add(c)
+    return prepare(builder.build())
+
+
+def write_index(index, path=INDEX_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_index(path=INDEX_FILE) -> dict:
+    """Load an index document and add the term -> id lookup queries use."""
+    with open(path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("version") != INDEX_VERSION:
+        raise ValueError(f"{path}: index version {index.get('version')}, expected {INDEX_VERSION}")
+    return prepare(index)
+
+
+def prepare(index) -> dict:
+    index["term_ids"] = {term: i for i, term in enumerate(index["terms"])}
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+def expand(index, token, prefix) -> list:
+    """Term ids a query token matches: itself, plus completions if `prefix`."""
+    exact = index["term_ids"].get(token)
+    ids = [] if exact is None else [exact]
+    if prefix and len(token) >= MIN_PREFIX:
+        completions = index["prefixes"].get(token[:MAX_PREFIX], [])
+        if len(token) > MAX_PREFIX:
+            completions = [i for i in completions if index["terms"][i].startswith(token)]
+        ids.extend(i for i in completions if i != exact)
+    return ids
+
+
+def query(index, text, limit=20, prefix=True) -> list:
+    """
+    Rank connectors for `text`. Every query token must match (the last
+    one also as a prefix, for search-as-you-type); scores are field-weighted
+    term frequency times idf. Returns [{uuid, name, slug, score}, ...].
+    """
+    tokens = tokenize(CAMEL_RE.sub(" ", text or ""))
+    if not tokens:
+        return []
+    n_docs = max(len(index["docs"]), 1)
+    total = None
+    for i, token in enumerate(tokens):
+        matched = defaultdict(float)
+        for term in expand(index, token, prefix and i == len(tokens) - 1):
+            postings = index["postings"][term]
+            idf = math.log(1 + n_docs / (len(postings) // 2))
+            for j in range(0, len(postings), 2):
+                doc, weight = postings[j], postings[j + 1]
+                # Best-matching expansion of this token counts once
+                matched[doc] = max(matched[doc], weight * idf)
+        if total is None:
+            total = matched
+        else:
+            total = {doc: score + matched[doc] for doc, score in total.items() if doc in matched}
+        if not total:
+            return []
+
+    ranked = sorted(total.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+    return [
+        {"uuid": index["docs"][doc][0], "name": index["docs"][doc][1],
+         "slug": index["docs"][doc][2], "score": round(score / 10, 2)}
+        for doc, score in ranked
+    ]
+
+
+def scan(connectors, text, limit=20) -> list:
+    """Linear-scan baseline: substring match of every token on every record."""
+    tokens = tokenize(text)
+    if not tokens:
+        return []
+    hits = []
+    for c in connectors:
+        caps = c.get("capabilities", {})
+        haystack = normalize(" ".join([
+            c.get("name", ""), c.get("one_liner", ""), c.get("description", ""),
+            " ".join(caps.get("tools", [])), " ".join(caps.get("use_cases", [])),
+        ]))
+        if all(t in haystack for t in tokens):
+            hits.append({"uuid": c.get("uuid", ""), "name": c.get("name", ""), "slug": c.get("slug", "")})
+    return hits[:limit]
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+BENCH_QUERIES = ["search", "meetings", "search meetings", "calendar", "issue tracker",
+                 "crm", "analytics dashboard", "pay", "docs", "email send"]
+
+
+def time_queries(fn, queries, repeats) -> dict:
+    samples = []
+    for _ in range(repeats):
+        for q in queries:
+            started = time.perf_counter()
+            fn(q)
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "queries": len(samples),
+        "p50_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[max(0, math.ceil(0.95 * len(samples)) - 1)], 4),
+    }
+
+
+def run_benchmark(index, connectors, queries=BENCH_QUERIES, repeats=50):
+    print(f"Benchmark: {len(connectors)} connectors, {len(index['terms'])} terms, "
+          f"{len(queries)} queries x {repeats}")
+    results = {
+        "index": time_queries(lambda q: query(index, q), queries, repeats),
+        "scan": time_queries(lambda q: scan(connectors, q), queries, repeats),
+    }
+    for name, r in results.items():
+        print(f"  {name:<6} p50 {r['p50_ms']:>8.3f} ms  p95 {r['p95_ms']:>8.3f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the MCP connector search index")
+    parser.add_argument("query", nargs="?", help="Search text")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--no-prefix", action="store_true",
+                        help="Match whole terms only (no completion of the last word)")
+    parser.add_argument("--bench", action="store_true",
+                        help="Time index lookups against a linear scan of mcp_connectors.json")
+    args = parser.parse_args()
+
+    if not os.path.exists(INDEX_FILE):
+        print(f"No index at {INDEX_FILE}. Run transform_mcp.py --index first.")
+        return
+    index = load_index()
+
+    if args.bench:
+        with open(CONNECTORS_FILE, "r", encoding="utf-8") as f:
+            connectors = json.load(f)["connectors"]
+        run_benchmark(index, connectors)
+        return
+
+    if not args.query:
+        parser.error("a query is required (or --bench)")
+    for hit in query(index, args.query, limit=args.limit, prefix=not args.no_prefix):
+        print(f"  {hit['score']:>8.2f}  {hit['name']}  ({hit['slug'] or hit['uuid']})")
+
+
+if __name__ == "__main__":
+    main()
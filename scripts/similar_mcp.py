@@ -0,0 +1,349 @@
+"""
+Similar-connector index and near-duplicate detection (MinHash + LSH).
+
+transform_mcp.py --similar feeds every connector to SimilarityBuilder
+while it writes mcp_connectors.json. Each connector becomes a set of
+features (tool name parts, use cases, description words) summarized by a
+MinHash signature; LSH banding only proposes connectors that share a
+band, so the build stays near-linear instead of all-pairs, and the
+proposals are then ranked by exact Jaccard.
+
+Usage:
+  1. Neighbours:  python3 similar_mcp.py "Circleback"        (name, slug or uuid)
+  2. Duplicates:  python3 similar_mcp.py --duplicates
+  3. Benchmark:   python3 similar_mcp.py --bench
+     (Compares LSH neighbours and build time with exact all-pairs Jaccard)
+
+Reads: mcp_similar.json (written by transform_mcp.py --similar), mcp_connectors.json (--bench)
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import time
+from array import array
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from search_mcp import split_identifier, tokenize
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SIMILAR_FILE = os.path.join(SCRIPT_DIR, "mcp_similar.json")
+CONNECTORS_FILE = os.path.join(SCRIPT_DIR, "mcp_connectors.json")
+SIMILAR_VERSION = 1
+
+NUM_HASHES = 128         # signature length
+BANDS = 64               # LSH bands of NUM_HASHES // BANDS rows; neighbours sit at 0.1-0.2 Jaccard
+ROWS = NUM_HASHES // BANDS
+FULL_BUCKET = 8          # buckets up to this size are paired exhaustively
+WINDOW = 3               # bigger ones: each member pairs with WINDOW either side (per-band order)
+MAX_BUCKET = 1000        # buckets this common carry no signal
+TOP_K = 5                # neighbours kept per connector
+MIN_SIMILARITY = 0.1     # Jaccard below this is not a neighbour
+DUPLICATE_SIMILARITY = 0.7
+MASK64 = (1 << 64) - 1
+
+# Words nearly every listing uses; they only add noise to the features
+COMMON_WORDS = frozenset(
+    "claude mcp server servers connector connect tool tools ai data access "
+    "use using can get help lets allows directly".split()
+)
+
+
+# ---------------------------------------------------------------------------
+# Shingles + MinHash
+# ---------------------------------------------------------------------------
+
+def shingles(c) -> set:
+    """
+    Feature set of a connector: tool name parts (SearchMeetings -> search,
+    meetings), use cases and description words. Whole words rather than
+    n-grams, since two vendors in one space rarely share phrasing.
+    """
+    caps = c.get("capabilities", {})
+    features = {"t:" + part for tool in caps.get("tools", []) for part in split_identifier(tool)}
+    features.update("u:" + case for case in caps.get("use_cases", []))
+    features.update("d:" + word for word in tokenize(c.get("one_liner", "") + " " + c.get("description", "")))
+    return {f for f in features if f[2:] not in COMMON_WORDS}
+
+
+def stable_hash(text) -> int:
+    """64-bit hash that, unlike hash(), is the same in every process."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash(hashes):
+    """
+    One-permutation MinHash over the features' stable_hash() values: each
+    hash picks one of NUM_HASHES bins and the bin keeps its minimum. Empty
+    bins are filled from the next non-empty bin (densification) so two
+    signatures agree in roughly Jaccard-similarity of their slots.
+    O(features + bins) rather than O(features * bins).
+    """
+    if not hashes:
+        return None
+    bins = [MASK64] * NUM_HASHES
+    for h in hashes:
+        b = h % NUM_HASHES
+        v = h // NUM_HASHES
+        if v < bins[b]:
+            bins[b] = v
+    signature = array("Q", bins)
+    for i in range(NUM_HASHES):
+        if bins[i] == MASK64:
+            step = 1
+            while bins[(i + step) % NUM_HASHES] == MASK64:
+                step += 1
+            # Offset by distance so a borrowed value differs from its source
+            signature[i] = (bins[(i + step) % NUM_HASHES] + step * 0x9E3779B97F4A7C15) & MASK64
+    return signature
+
+
+def jaccard(a, b) -> float:
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if a or b else 0.0
+
+
+def url_key(url) -> str:
+    parsed = urlparse(url or "")
+    return (parsed.netloc.lower().removeprefix("www.") + parsed.path.rstrip("/")) if parsed.netloc else ""
+
+
+def name_key(name) -> str:
+    return " ".join(tokenize(name))
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+class SimilarityBuilder:
+    """Signatures, feature hashes and exact-match keys, one connector at a time."""
+
+    def __init__(self):
+        self.docs = []
+        self.features = []
+        self.signatures = []
+        self.by_url = defaultdict(list)
+        self.by_name = defaultdict(list)
+
+    def add(self, c):
+        doc = len(self.docs)
+        features = frozenset(map(stable_hash, shingles(c)))
+        self.docs.append([c.get("uuid", ""), c.get("name", "")])
+        self.features.append(features)
+        self.signatures.append(minhash(features))
+        key = url_key(c.get("connection", {}).get("url", ""))
+        if key:
+            self.by_url[key].append(doc)
+        key = name_key(c.get("name", ""))
+        if key:
+            self.by_name[key].append(doc)
+
+    def candidates(self):
+        """
+        (doc, later docs sharing at least one LSH band), one document at a
+        time, so only one document's candidates are held at once. Small
+        buckets are paired exhaustively; in bigger ones (a crowded niche)
+        each member is only paired with the WINDOW members either side of
+        it, with the bucket sorted by the signature read from that band on.
+        Adjacent members then share the longest run of slots, so the window
+        keeps the closest ones, and candidates grow linearly with the
+        catalog instead of with the square of the bucket size.
+        """
+        width = ROWS * 8  # bytes per band of a "Q" signature
+        buckets = [defaultdict(list) for _ in range(BANDS)]
+        raws = [sig.tobytes() if sig is not None else None for sig in self.signatures]
+        for doc, raw in enumerate(raws):
+            if raw is not None:
+                for band in range(BANDS):
+                    buckets[band][raw[band * width:(band + 1) * width]].append(doc)
+        ranks = {}
+        for band, bucket in enumerate(buckets):
+            start = band * ROWS
+            for chunk, docs in bucket.items():
+                if FULL_BUCKET < len(docs) <= MAX_BUCKET:
+                    docs.sort(key=lambda d: self.signatures[d][start:] + self.signatures[d][:start])
+                    ranks[band, chunk] = {d: i for i, d in enumerate(docs)}
+
+        for a, raw in enumerate(raws):
+            if raw is None:
+                continue
+            near = set()
+            for band in range(BANDS):
+                chunk = raw[band * width:(band + 1) * width]
+                docs = buckets[band][chunk]
+                if len(docs) == 1:
+                    continue
+                if len(docs) <= FULL_BUCKET:
+                    near.update(docs)
+                elif len(docs) <= MAX_BUCKET:
+                    i = ranks[band, chunk][a]
+                    near.update(docs[max(0, i - WINDOW):i + WINDOW + 1])
+            yield a, [b for b in near if b > a]
+
+    def build(self) -> dict:
+        """
+        The similarity document: top-k neighbours per connector and clusters
+        of likely duplicates, linked by high similarity, a shared connection
+        URL or the same normalized name. LSH only proposes candidates; each
+        one is scored by exact Jaccard of the feature hashes, so signature
+        noise never reorders neighbours.
+        """
+        neighbours = defaultdict(list)  # per doc: min-heap of (score, -other), at most TOP_K
+        candidate_pairs = 0
+        parent = {}
+        reasons = defaultdict(set)
+
+        def find(doc):
+            while parent.get(doc, doc) != doc:
+                parent[doc] = parent.get(parent[doc], parent[doc])
+                doc = parent[doc]
+            return doc
+
+        def link(a, b, reason):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+                reasons[min(ra, rb)] |= reasons.pop(max(ra, rb), set())
+            reasons[find(a)].add(reason)
+
+        for a, near in self.candidates():
+            candidate_pairs += len(near)
+            for b in near:
+                score = jaccard(self.features[a], self.features[b])
+                if score >= MIN_SIMILARITY:
+                    for doc, other in ((a, b), (b, a)):
+                        heap = neighbours[doc]
+                        if len(heap) < TOP_K:
+                            heapq.heappush(heap, (score, -other))
+                        elif (score, -other) > heap[0]:
+                            heapq.heapreplace(heap, (score, -other))
+                if score >= DUPLICATE_SIMILARITY:
+                    link(a, b, "similar")
+        for reason, groups in (("same_url", self.by_url), ("same_name", self.by_name)):
+            for docs in groups.values():
+                for other in docs[1:]:
+                    link(docs[0], other, reason)
+
+        clusters = defaultdict(list)
+        for doc in set(parent) | set(parent.values()):
+            clusters[find(doc)].append(doc)
+
+        def uuid(doc):
+            return self.docs[doc][0]
+
+        return {
+            "version": SIMILAR_VERSION,
+            "params": {"hashes": NUM_HASHES, "bands": BANDS, "top_k": TOP_K,
+                       "min_similarity": MIN_SIMILARITY, "duplicate_similarity": DUPLICATE_SIMILARITY},
+            "candidate_pairs": candidate_pairs,
+            "neighbours": {
+                uuid(doc): [[uuid(-other), round(score, 3)] for score, other in sorted(heap, reverse=True)]
+                for doc, heap in sorted(neighbours.items())
+            },
+            "duplicates": [
+                {"uuids": [uuid(d) for d in sorted(docs)],
+                 "names": [self.docs[d][1] for d in sorted(docs)],
+                 "reasons": sorted(reasons[root])}
+                for root, docs in sorted(clusters.items())
+            ],
+        }
+
+
+def write_similar(similar, path=SIMILAR_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(similar, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_similar(path=SIMILAR_FILE) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        similar = json.load(f)
+    if similar.get("version") != SIMILAR_VERSION:
+        raise ValueError(f"{path}: version {similar.get('version')}, expected {SIMILAR_VERSION}")
+    return similar
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: LSH against exact all-pairs Jaccard
+# ---------------------------------------------------------------------------
+
+def run_benchmark(connectors):
+    started = time.perf_counter()
+    builder = SimilarityBuilder()
+    for c in connectors:
+        builder.add(c)
+    built = builder.build()
+    lsh_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    sets = [shingles(c) for c in connectors]
+    exact = defaultdict(list)
+    for a in range(len(sets)):
+        for b in range(a + 1, len(sets)):
+            score = jaccard(sets[a], sets[b])
+            if score >= MIN_SIMILARITY:
+                exact[a].append((score, b))
+                exact[b].append((score, a))
+    exact_s = time.perf_counter() - started
+
+    # Recall: share of exact top-k neighbours that LSH also returns
+    uuids = [c.get("uuid", "") for c in connectors]
+    found = expected = 0
+    for a, near in exact.items():
+        want = {uuids[b] for _, b in heapq.nlargest(TOP_K, near, key=lambda x: (x[0], -x[1]))}
+        got = {u for u, _ in built["neighbours"].get(uuids[a], [])}
+        expected += len(want)
+        found += len(want & got)
+
+    print(f"Benchmark: {len(connectors)} connectors")
+    print(f"  LSH:       {lsh_s:.3f}s ({built['candidate_pairs']} candidate pairs)")
+    print(f"  All-pairs: {exact_s:.3f}s ({len(connectors) * (len(connectors) - 1) // 2} pairs)")
+    print(f"  Top-{TOP_K} recall vs exact: {found / expected:.1%}" if expected else "  No exact neighbours")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Similar connectors and likely duplicates")
+    parser.add_argument("connector", nargs="?", help="Name, slug or uuid")
+    parser.add_argument("--duplicates", action="store_true", help="List likely duplicates")
+    parser.add_argument("--bench", action="store_true",
+                        help="Compare against exact all-pairs Jaccard on mcp_connectors.json")
+    args = parser.parse_args()
+
+    if args.bench or args.connector:
+        with open(CONNECTORS_FILE, "r", encoding="utf-8") as f:
+            connectors = json.load(f)["connectors"]
+    if args.bench:
+        run_benchmark(connectors)
+        return
+
+    if not os.path.exists(SIMILAR_FILE):
+        print(f"No similarity index at {SIMILAR_FILE}. Run transform_mcp.py --similar first.")
+        return
+    similar = load_similar()
+
+    if args.duplicates:
+        for d in similar["duplicates"]:
+            print(f"  {'  <->  '.join(d['names'])}  ({', '.join(d['reasons'])})")
+        print(f"{len(similar['duplicates'])} groups of likely duplicates")
+        return
+
+    if not args.connector:
+        parser.error("a connector is required (or --duplicates / --bench)")
+    wanted = args.connector.lower()
+    match = next((c for c in connectors if wanted in (c["uuid"], c["slug"].lower(), c["name"].lower())), None)
+    if not match:
+        print(f"No connector named {args.connector!r}")
+        return
+    names = {c["uuid"]: c["name"] for c in connectors}
+    print(f"Similar to {match['name']}:")
+    for uuid, score in similar["neighbours"].get(match["uuid"], []):
+        print(f"  {score:.2f}  {names.get(uuid, uuid)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,46 +3,223 @@ Transform raw MCP registry data into a clean, grouped schema
 for the directory listing.
 
 Usage:
-  python3 transform_mcp.py
+  python3 transform_mcp.py           (reuses cached output for unchanged entries)
+  python3 transform_mcp.py --full    (re-transform everything; changes are still reported)
+  python3 transform_mcp.py --split   (also write the mcp_connectors/ manifest + detail shards)
+  python3 transform_mcp.py --index --facets --similar
+                                     (also build the search, facet and similarity artifacts)
 
-Reads:  mcp-raw.json, mcp-raw-2.json (if exists)
-Writes: mcp_connectors.json
+Reads:  mcp-raw-page-*.json (fetch_registry.py), mcp-raw-captured.json,
+        mcp-raw.json, mcp-raw-2.json (if they exist; the first copy of a
+        uuid wins), mcp_health.json (probe_health.py; attached to each
+        connector as "health" if present)
+Writes: mcp_connectors.json, mcp_connectors_changes.json (added / removed /
+        modified since the last run, with field-level diffs)
+        With --index: mcp_search_index.json (inverted index, queried via search_mcp.py)
+        With --facets: mcp_facets.json (counts + id postings per facet, see facets_mcp.py)
+        With --similar: mcp_similar.json (top-k similar connectors + duplicate
+        groups, see similar_mcp.py)
+        With --split: mcp_connectors/manifest.json (listing fields only) and
+        mcp_connectors/detail/<slug>.<hash>.json, minified, each with .gz and
+        .br (if brotli is installed) siblings
+
+Raw files are parsed incrementally and the name sort is an external merge
+of sorted runs spilled to a temp dir, so a plain run's memory stays flat
+as the registry grows. The --index, --facets and --similar builders keep
+per-connector postings and signatures, so their memory grows with it.
 """
 
+import argparse
+import glob
+import gzip
+import hashlib
+import heapq
+import inspect
 import json
 import os
+import pickle
+import re
+import tempfile
+from collections import Counter
+from datetime import datetime
+
+import facets_mcp
+import probe_health
+import search_mcp
+import similar_mcp
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Newest first: dedup keeps the first copy of a uuid, so a live capture
+# beats the hand-saved files
 RAW_FILES = [
+    os.path.join(SCRIPT_DIR, "mcp-raw-captured.json"),  # scrap_connectors.py --capture-api
     os.path.join(SCRIPT_DIR, "mcp-raw.json"),
     os.path.join(SCRIPT_DIR, "mcp-raw-2.json"),
 ]
+RAW_PAGE_GLOB = os.path.join(SCRIPT_DIR, "mcp-raw-page-*.json")  # fetch_registry.py
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, "mcp_connectors.json")
+CHANGES_FILE = os.path.join(SCRIPT_DIR, "mcp_connectors_changes.json")
+CACHE_FILE = os.path.join(SCRIPT_DIR, ".transform_cache.bin")
+CACHE_MAGIC = b"transform_mcp cache 2\n"
+REGISTRY_META_KEY = "com.anthropic.api/mcp-registry"
+SPLIT_DIR = os.path.join(SCRIPT_DIR, "mcp_connectors")
+HASH_LEN = 12  # hex digits of sha256 in content-hashed filenames
+
+READ_CHUNK = 1 << 16    # characters read per refill while streaming raw files
+SORT_RUN_SIZE = 5000    # connectors sorted in memory before spilling a run
+
+
+# ---------------------------------------------------------------------------
+# Streaming input
+# ---------------------------------------------------------------------------
+
+class JsonStream:
+    """Chunked reader that decodes one JSON value at a time from a file."""
+
+    def __init__(self, f, chunk_size=READ_CHUNK):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self) -> bool:
+        """Drop the consumed prefix and read more; False at end of file."""
+        # Read at least as much as is buffered so a large value costs
+        # O(n) retries, not O(n / chunk_size)
+        chunk = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, ch):
+        found = self.peek()
+        if found != ch:
+            raise ValueError(f"expected {ch!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self, with_text=False):
+        """Decode the next complete JSON value; with_text, also its source text."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number that runs to the end of the buffer may continue in
+            # the next chunk (other values are self-delimiting)
+            if (isinstance(obj, (int, float)) and not self.eof
+                    and not self.buf[end:].strip("0123456789.eE+-") and self.fill()):
+                continue
+            text = self.buf[self.pos:end] if with_text else None
+            self.pos = end
+            return (obj, text) if with_text else obj
 
 
-def load_raw_servers() -> list:
-    """Load and merge servers from all raw files."""
-    servers = []
-    for path in RAW_FILES:
+def iter_servers(path, with_text=False):
+    """
+    Yield the entries of a raw file's "servers" array one at a time; with
+    with_text, as (entry, source JSON text) pairs.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        stream = JsonStream(f)
+        if not stream.peek():
+            return
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "servers" and stream.peek() == "[":
+                stream.expect("[")
+                if stream.peek() != "]":
+                    while True:
+                        yield stream.value(with_text)
+                        if stream.peek() != ",":
+                            break
+                        stream.expect(",")
+                stream.expect("]")
+            else:
+                stream.value()  # metadata etc.
+            if stream.peek() != ",":
+                break
+            stream.expect(",")
+        stream.expect("}")
+
+
+def raw_files() -> list:
+    """
+    Fetched registry pages in page order, then the captured and hand-saved
+    raw files. Dedup keeps the first copy of a uuid, so fetched data wins.
+    """
+    return sorted(glob.glob(RAW_PAGE_GLOB)) + RAW_FILES
+
+
+def load_raw_servers():
+    """
+    Stream servers from all raw files as (entry, source JSON text) pairs;
+    the text is what the cache hashes.
+    """
+    for path in raw_files():
         if not os.path.exists(path):
             continue
+        count = 0
         try:
-            with open(path, "r") as f:
-                content = f.read().strip()
-                if not content:
-                    continue
-                data = json.loads(content)
-            servers.extend(data.get("servers", []))
-            print(f"  Loaded {len(data.get('servers', []))} servers from {os.path.basename(path)}")
+            for server in iter_servers(path, with_text=True):
+                count += 1
+                yield server
+            print(f"  Loaded {count} servers from {os.path.basename(path)}")
         except Exception as e:
-            print(f"  Skipped {os.path.basename(path)}: {e}")
-    return servers
+            print(f"  Skipped {os.path.basename(path)} after {count} servers: {e}")
+
+
+def raw_uuid(raw) -> str:
+    """uuid of a raw registry entry ('' if missing)."""
+    return raw.get("_meta", {}).get(REGISTRY_META_KEY, {}).get("uuid", "")
+
+
+def entry_uuid(entry) -> str:
+    """uuid of a load_raw_servers() (entry, text) pair."""
+    return raw_uuid(entry[0])
+
+
+def unique_servers(servers, key=raw_uuid):
+    """Drop repeated entries for the same uuid (`key`), keeping the first."""
+    seen = set()
+    for s in servers:
+        uuid = key(s)
+        if uuid and uuid in seen:
+            continue
+        seen.add(uuid)
+        yield s
 
 
 def transform(raw) -> dict:
     """Transform a single raw server entry into the clean schema."""
     server = raw.get("server", {})
-    reg = raw.get("_meta", {}).get("com.anthropic.api/mcp-registry", {})
+    reg = raw.get("_meta", {}).get(REGISTRY_META_KEY, {})
     official = raw.get("_meta", {}).get("io.modelcontextprotocol.registry/official", {})
 
     remote = server.get("remotes", [{}])[0] if server.get("remotes") else {}
@@ -116,63 +293,501 @@ def transform(raw) -> dict:
     }
 
 
-def main():
-    print("Loading raw data...")
-    raw_servers = load_raw_servers()
+# ---------------------------------------------------------------------------
+# Incremental transform
+# ---------------------------------------------------------------------------
+
+# Folded into every entry hash, so editing transform() invalidates the cache
+TRANSFORM_SALT = hashlib.sha1(inspect.getsource(transform).encode("utf-8")).hexdigest()
+
+
+def entry_hash(text) -> str:
+    """
+    Content hash of a raw entry's JSON text as read. Hashing the text
+    instead of a re-serialized entry costs a fraction of the transform;
+    the same entry re-saved with other formatting only misses the cache.
+    """
+    return hashlib.sha1((TRANSFORM_SALT + text).encode("utf-8")).hexdigest()
+
+
+def pack(connector) -> bytes:
+    """Serialized connector, as the cache and the sorted runs store it."""
+    return pickle.dumps(connector, pickle.HIGHEST_PROTOCOL)
+
+
+class TransformCache:
+    """
+    Transformed output of the previous run keyed by registry uuid. After a
+    magic line, each record is a `uuid<TAB>hash<TAB>size` header line and
+    `size` bytes of pack(connector). Only uuid -> (hash, offset, size) is
+    kept in memory; cached connectors are read back by seeking. The next
+    cache is written alongside and swapped in by commit(). With
+    reuse=False every entry is re-transformed but still diffed.
+    """
+
+    def __init__(self, path=CACHE_FILE, reuse=True):
+        self.path = path
+        self.reuse = reuse
+        self.index = {}
+        self.reader = None
+        if os.path.exists(path):
+            self.reader = open(path, "rb")
+            if self.reader.readline() == CACHE_MAGIC:
+                for header in iter(self.reader.readline, b""):
+                    parts = header.rstrip(b"\n").split(b"\t")
+                    if len(parts) != 3:
+                        break
+                    size = int(parts[2])
+                    self.index[parts[0].decode("utf-8")] = (parts[1].decode("ascii"), self.reader.tell(), size)
+                    self.reader.seek(size, os.SEEK_CUR)
+        self.writer = open(path + ".tmp", "wb")
+        self.writer.write(CACHE_MAGIC)
+
+    def previous_packed(self, uuid):
+        """pack() of the connector cached for `uuid` by the last run, or None."""
+        if uuid not in self.index:
+            return None
+        _, offset, size = self.index[uuid]
+        self.reader.seek(offset)
+        return self.reader.read(size)
 
-    if not raw_servers:
-        print("No servers found!")
-        return
+    def previous(self, uuid):
+        """Connector cached for `uuid` by the last run, or None."""
+        packed = self.previous_packed(uuid)
+        return pickle.loads(packed) if packed is not None else None
 
-    # Deduplicate by uuid
+    def put(self, uuid, digest, packed):
+        self.writer.write(f"{uuid}\t{digest}\t{len(packed)}\n".encode("utf-8"))
+        self.writer.write(packed)
+
+    def commit(self):
+        self.writer.close()
+        if self.reader:
+            self.reader.close()
+        os.replace(self.path + ".tmp", self.path)
+
+    def abort(self):
+        self.writer.close()
+        if self.reader:
+            self.reader.close()
+        try:
+            os.remove(self.path + ".tmp")
+        except OSError:
+            pass
+
+
+def diff_fields(old, new, prefix="") -> dict:
+    """
+    Field-level differences between two connectors as dotted paths.
+    Lists of strings (tools, use cases, ...) report added/removed items.
+    """
+    changes = {}
+    for key in list(new) + [k for k in old if k not in new]:
+        path = prefix + key
+        a, b = old.get(key), new.get(key)
+        if a == b:
+            continue
+        if isinstance(a, dict) and isinstance(b, dict):
+            changes.update(diff_fields(a, b, path + "."))
+            continue
+        if (isinstance(a, list) and isinstance(b, list)
+                and all(isinstance(x, str) for x in a + b)):
+            added = [x for x in b if x not in a]
+            removed = [x for x in a if x not in b]
+            if added or removed:
+                changes[path] = {"added": added, "removed": removed}
+                continue
+        changes[path] = {"old": a, "new": b}
+    return changes
+
+
+def summary(connector) -> dict:
+    return {"uuid": connector["uuid"], "name": connector["name"], "slug": connector["slug"]}
+
+
+def transform_incremental(servers, cache, changes):
+    """
+    Transform a stream of (entry, text) pairs, reusing cached output for
+    entries whose content hash is unchanged, and record what changed in
+    `changes`. Yields (connector, pack(connector)) so the connector is
+    serialized once for both the cache and the sorted runs.
+    """
     seen = set()
-    unique = []
-    for s in raw_servers:
-        uuid = s.get("_meta", {}).get("com.anthropic.api/mcp-registry", {}).get("uuid", "")
-        if uuid and uuid in seen:
+    for raw, text in servers:
+        uuid = raw_uuid(raw)
+        if not uuid:
+            changes["unkeyed"] += 1
+            connector = transform(raw)
+            yield connector, pack(connector)
             continue
         seen.add(uuid)
-        unique.append(s)
+        digest = entry_hash(text)
+        cached = cache.index.get(uuid)
+        if cached and cached[0] == digest and cache.reuse:
+            packed = cache.previous_packed(uuid)
+            connector = pickle.loads(packed)
+            changes["unchanged"] += 1
+            changes["reused"] += 1
+        else:
+            connector = transform(raw)
+            packed = pack(connector)
+            if cached:
+                fields = diff_fields(cache.previous(uuid), connector)
+                if fields:
+                    changes["modified"].append({**summary(connector), "fields": fields})
+                else:
+                    changes["unchanged"] += 1  # raw changed, output didn't
+            else:
+                changes["added"].append(summary(connector))
+        cache.put(uuid, digest, packed)
+        yield connector, packed
 
-    print(f"\nTransforming {len(unique)} servers...")
-    connectors = [transform(s) for s in unique]
+    for uuid in cache.index:
+        if uuid not in seen:
+            changes["removed"].append(summary(cache.previous(uuid)))
 
-    # Sort alphabetically by name
-    connectors.sort(key=lambda c: c["name"].lower())
 
-    output = {
-        "total": len(connectors),
-        "generated_at": __import__("datetime").datetime.utcnow().isoformat() + "Z",
-        "connectors": connectors,
+def write_changes(changes, path=CHANGES_FILE):
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "previous_run": changes["previous_run"],
+        "counts": {
+            "added": len(changes["added"]),
+            "removed": len(changes["removed"]),
+            "modified": len(changes["modified"]),
+            "unchanged": changes["unchanged"],
+            "unkeyed": changes["unkeyed"],
+        },
+        "added": changes["added"],
+        "removed": changes["removed"],
+        "modified": changes["modified"],
     }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+    return report
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
 
-    print(f"Wrote {len(connectors)} connectors -> {OUTPUT_FILE}")
+# ---------------------------------------------------------------------------
+# External sort + streaming output
+# ---------------------------------------------------------------------------
 
-    # Summary stats
-    has_html = sum(1 for c in connectors if c["html_content"])
-    has_slug = sum(1 for c in connectors if c["slug"])
-    has_cases = sum(1 for c in connectors if c["capabilities"]["use_cases"])
-    has_cmd = sum(1 for c in connectors if c["connection"]["claude_code_command"])
-    has_video = sum(1 for c in connectors if c["branding"]["hero_video_id"])
-    has_images = sum(1 for c in connectors if c["branding"]["images"])
-    authless = sum(1 for c in connectors if c["connection"]["is_authless"])
-    has_app = sum(1 for c in connectors if c["capabilities"]["has_mcp_app"])
-    total_tools = sum(len(c["capabilities"]["tools"]) for c in connectors)
+def sort_key(connector) -> str:
+    return connector["name"].lower()
 
-    print(f"\n--- Stats ---")
-    print(f"  Total tools across all servers: {total_tools}")
-    print(f"  Authless (no login needed):     {authless}")
-    print(f"  Has MCP app:                    {has_app}")
-    print(f"  Has rich HTML content:          {has_html}")
-    print(f"  Has slug:                       {has_slug}")
-    print(f"  Has use case tags:              {has_cases}")
-    print(f"  Has claude code command:        {has_cmd}")
-    print(f"  Has hero video:                 {has_video}")
-    print(f"  Has promo images:               {has_images}")
 
+def write_run(batch, tmpdir, n) -> str:
+    """Sort one batch of (connector, packed) by name and spill it to disk."""
+    batch.sort(key=lambda item: sort_key(item[0]))
+    path = os.path.join(tmpdir, f"run-{n:05d}.bin")
+    with open(path, "wb") as f:
+        for _, packed in batch:
+            f.write(packed)
+    return path
+
+
+def read_run(f):
+    """Connectors of one run file, in order (pickles are self-delimiting)."""
+    while True:
+        try:
+            yield pickle.load(f)
+        except EOFError:
+            return
+
+
+def spill_sorted_runs(items, tmpdir, run_size=SORT_RUN_SIZE):
+    """
+    Split a (connector, packed) stream into sorted run files. Returns
+    (runs, count). A stream that fits in one run is sorted in memory and
+    returned as a list instead of a file, so small registries skip the
+    spill and the re-parse.
+    """
+    runs, batch, total = [], [], 0
+    for item in items:
+        batch.append(item)
+        total += 1
+        if len(batch) >= run_size:
+            runs.append(write_run(batch, tmpdir, len(runs)))
+            batch = []
+    if batch and not runs:
+        batch.sort(key=lambda item: sort_key(item[0]))
+        runs.append([c for c, _ in batch])
+    elif batch:
+        runs.append(write_run(batch, tmpdir, len(runs)))
+    return runs, total
+
+
+def merge_runs(runs):
+    """k-way merge of sorted runs, files or in-memory lists (stable, like list.sort)."""
+    files = [open(run, "rb") for run in runs if isinstance(run, str)]
+    try:
+        if len(runs) == 1 and not files:
+            yield from runs[0]
+            return
+        streams = [read_run(f) for f in files]
+        yield from heapq.merge(*streams, key=sort_key)
+    finally:
+        for f in files:
+            f.close()
+
+
+def write_connectors(path, connectors, total):
+    """
+    Write the output document one connector at a time, in the same layout
+    json.dump(indent=2) produced. Written to a temp file and renamed so a
+    failed run never leaves half a file behind.
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        f.write(f'  "total": {total},\n')
+        f.write(f'  "generated_at": {json.dumps(datetime.utcnow().isoformat() + "Z")},\n')
+        f.write('  "connectors": [')
+        for i, c in enumerate(connectors):
+            body = json.dumps(c, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+            f.write(("," if i else "") + "\n    " + body)
+        f.write("\n  ]\n}" if total else "]\n}")
+    os.replace(tmp, path)
+
+
+class SummaryStats:
+    """Counters for the end-of-run stats; constant memory, unlike the artifact builders."""
+
+    FIELDS = {
+        "authless": lambda c: c["connection"]["is_authless"],
+        "has_app": lambda c: c["capabilities"]["has_mcp_app"],
+        "has_html": lambda c: c["html_content"],
+        "has_slug": lambda c: c["slug"],
+        "has_cases": lambda c: c["capabilities"]["use_cases"],
+        "has_cmd": lambda c: c["connection"]["claude_code_command"],
+        "has_video": lambda c: c["branding"]["hero_video_id"],
+        "has_images": lambda c: c["branding"]["images"],
+    }
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def add(self, c):
+        self.counts["total_tools"] += len(c["capabilities"]["tools"])
+        for name, value in self.FIELDS.items():
+            self.counts[name] += bool(value(c))
+
+
+def feed(connectors, *builders):
+    """Hand each connector to the artifact builders as it streams past."""
+    for c in connectors:
+        for builder in builders:
+            builder.add(c)
+        yield c
+
+
+# ---------------------------------------------------------------------------
+# Split output: listing manifest + per-connector detail shards
+# ---------------------------------------------------------------------------
+
+def listing_entry(c, detail) -> dict:
+    """Fields the card grid needs; everything else lives in the detail shard."""
+    author = c["author"] if isinstance(c["author"], dict) else {}
+    return {
+        "uuid": c["uuid"],
+        "slug": c["slug"],
+        "name": c["name"],
+        "one_liner": c["one_liner"],
+        "icon_url": c["branding"]["icon_url"],
+        "transport": c["connection"]["transport"],
+        "is_authless": c["connection"]["is_authless"],
+        "has_mcp_app": c["capabilities"]["has_mcp_app"],
+        "use_cases": c["capabilities"]["use_cases"],
+        "works_with": c["capabilities"]["works_with"],
+        "author": author.get("name", ""),
+        "tool_count": len(c["capabilities"]["tools"]),
+        "detail": detail,
+    }
+
+
+def minify(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def write_bytes(path, body):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+
+def write_compressed(path, body, split):
+    """Write `body` plus its .gz / .br siblings."""
+    write_bytes(path, body)
+    gz = gzip.compress(body, compresslevel=9, mtime=0)
+    write_bytes(path + ".gz", gz)
+    split["bytes"] += len(body)
+    split["gz_bytes"] += len(gz)
+    if brotli:
+        br = brotli.compress(body, quality=11)
+        write_bytes(path + ".br", br)
+        split["br_bytes"] += len(br)
+
+
+def write_hashed(directory, stem, body, split):
+    """
+    Write `body` as <stem>.<hash>.json (+ .gz/.br). Returns (filename,
+    written). The name changes whenever the content does, so these files
+    can be served as immutable; an existing file with the same name is kept.
+    """
+    name = f"{stem}.{hashlib.sha256(body).hexdigest()[:HASH_LEN]}.json"
+    path = os.path.join(directory, name)
+    split["files"].add(name)
+    if os.path.exists(path) and os.path.exists(path + ".gz"):
+        return name, False
+    write_compressed(path, body, split)
+    return name, True
+
+
+def shard_stem(c, used) -> str:
+    """Filename stem for a connector: its slug, or uuid if missing/taken."""
+    stem = re.sub(r"[^a-z0-9._-]+", "-", (c["slug"] or "").lower()).strip("-.")
+    if not stem or stem in used:
+        stem = c["uuid"] or f"connector-{len(used)}"
+    used.add(stem)
+    return stem
+
+
+def write_split(connectors, split, out_dir=SPLIT_DIR):
+    """
+    Write a minified detail shard per connector as the stream passes,
+    collecting the listing entries for the manifest in `split`.
+    """
+    detail_dir = os.path.join(out_dir, "detail")
+    os.makedirs(detail_dir, exist_ok=True)
+    used = set()
+    for c in connectors:
+        name, written = write_hashed(detail_dir, shard_stem(c, used), minify(c), split)
+        split["written" if written else "reused"] += 1
+        split["entries"].append(listing_entry(c, f"detail/{name}"))
+        yield c
+
+
+def finish_split(split, out_dir=SPLIT_DIR):
+    """Write the manifest and drop detail shards no longer referenced."""
+    manifest = minify({"total": len(split["entries"]), "connectors": split["entries"]})
+    hashed, _ = write_hashed(out_dir, "manifest", manifest, split)
+    # Stable entry point (short cache) next to the immutable hashed copy
+    write_compressed(os.path.join(out_dir, "manifest.json"), manifest, split)
+    split["manifest_bytes"] = len(manifest)
+
+    removed = 0
+    for directory, pattern in ((os.path.join(out_dir, "detail"), "*.json"), (out_dir, "manifest.*.json")):
+        for path in glob.glob(os.path.join(directory, pattern)):
+            if os.path.basename(path) not in split["files"]:
+                for stale in (path, path + ".gz", path + ".br"):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+                removed += 1
+    split["removed"] = removed
+    return hashed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transform raw MCP registry data for the directory")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-transform every entry instead of reusing cached output")
+    parser.add_argument("--split", action="store_true",
+                        help=f"Also write a listing manifest + per-connector detail shards to {SPLIT_DIR}")
+    parser.add_argument("--index", action="store_true", help=f"Also write the search index ({search_mcp.INDEX_FILE})")
+    parser.add_argument("--facets", action="store_true", help=f"Also write facet postings ({facets_mcp.FACETS_FILE})")
+    parser.add_argument("--similar", action="store_true",
+                        help=f"Also write similar connectors + duplicates ({similar_mcp.SIMILAR_FILE})")
+    args = parser.parse_args()
+
+    print("Loading raw data...")
+    servers = unique_servers(load_raw_servers(), key=entry_uuid)
+
+    cache = TransformCache(reuse=not args.full)
+    changes = {"previous_run": bool(cache.index), "added": [], "removed": [],
+               "modified": [], "unchanged": 0, "reused": 0, "unkeyed": 0}
+    split = Counter(entries=[], files=set())
+    health = probe_health.load_health()
+    stats = SummaryStats()
+    # Each artifact builder keeps per-connector state, so only requested ones run
+    builders = {}
+    if args.index:
+        builders["index"] = search_mcp.IndexBuilder()
+    if args.facets:
+        builders["facets"] = facets_mcp.FacetBuilder()
+    if args.similar:
+        builders["similar"] = similar_mcp.SimilarityBuilder()
+    try:
+        with tempfile.TemporaryDirectory(prefix="transform_mcp-") as tmpdir:
+            runs, total = spill_sorted_runs(transform_incremental(servers, cache, changes), tmpdir)
+            if not total:
+                print("No servers found!")
+                cache.abort()
+                return
+
+            print(f"\nTransformed {total} servers ({len(runs)} sorted run(s)), merging...")
+            stream = feed(merge_runs(runs), stats, *builders.values())
+            if health:
+                stream = probe_health.attach_health(stream, health)
+            if args.split:
+                stream = write_split(stream, split)
+            write_connectors(OUTPUT_FILE, stream, total)
+            if args.split:
+                manifest_name = finish_split(split)
+            if args.index:
+                index = builders["index"].build()
+                search_mcp.write_index(index)
+            if args.facets:
+                facets = builders["facets"].build()
+                facets_mcp.write_facets(facets)
+            if args.similar:
+                similar = builders["similar"].build()
+                similar_mcp.write_similar(similar)
+    except BaseException:
+        cache.abort()
+        raise
+    cache.commit()
+    report = write_changes(changes)
+
+    print(f"Wrote {total} connectors -> {OUTPUT_FILE}")
+    if health:
+        print(f"  with health from {probe_health.HEALTH_FILE} ({len(health)} endpoints)")
+    if args.index:
+        print(f"Wrote search index ({len(index['terms'])} terms, {len(index['prefixes'])} prefixes) "
+              f"-> {search_mcp.INDEX_FILE}")
+    if args.facets:
+        print(f"Wrote facets ({sum(len(v) for v in facets['facets'].values())} values) -> {facets_mcp.FACETS_FILE}")
+    if args.similar:
+        print(f"Wrote similar connectors ({len(similar['neighbours'])} with neighbours, "
+              f"{len(similar['duplicates'])} groups of likely duplicates) -> {similar_mcp.SIMILAR_FILE}")
+    if args.split:
+        print(f"Wrote manifest ({split['manifest_bytes'] / 1024:.0f} KB, {manifest_name}) "
+              f"+ {total} detail shards -> {SPLIT_DIR}")
+        print(f"  Shards written: {split['written']}, unchanged: {split['reused']}, "
+              f"removed: {split['removed']}")
+        print(f"  Written bytes: {split['bytes'] / 1024:.0f} KB raw, {split['gz_bytes'] / 1024:.0f} KB gzip"
+              + (f", {split['br_bytes'] / 1024:.0f} KB brotli" if brotli else " (pip install brotli for .br)"))
+
+    counts = report["counts"]
+    print(f"\n--- Changes ---")
+    print(f"  Added:     {counts['added']}")
+    print(f"  Removed:   {counts['removed']}")
+    print(f"  Modified:  {counts['modified']}")
+    print(f"  Unchanged: {counts['unchanged']} ({changes['reused']} reused from cache)")
+    print(f"  Report  -> {CHANGES_FILE}")
+
+    counts = stats.counts
+    print(f"\n--- Stats ---")
+    print(f"  Total tools across all servers: {counts['total_tools']}")
+    print(f"  Authless (no login needed):     {counts['authless']}")
+    print(f"  Has MCP app:                    {counts['has_app']}")
+    print(f"  Has rich HTML content:          {counts['has_html']}")
+    print(f"  Has slug:                       {counts['has_slug']}")
+    print(f"  Has use case tags:              {counts['has_cases']}")
+    print(f"  Has claude code command:        {counts['has_cmd']}")
+    print(f"  Has hero video:                 {counts['has_video']}")
+    print(f"  Has promo images:               {counts['has_images']}")
 
 if __name__ == "__main__":
     main()